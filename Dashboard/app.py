@@ -3,19 +3,49 @@ import pandas as pd
 from datetime import datetime, timedelta
 from common.session import check_password
 from common.menu import show_menu
-from functions.data_processing import load_and_prepare_data
+from functions.data_processing import (
+    load_data,
+    load_player_index,
+    player_rows,
+    player_window,
+    players_window
+)
 from functions.player_analysis import (
-    plot_speed_timeline,
-    plot_acceleration_timeline,
-    plot_distance_timeline,
-    plot_performance_timeline,
-    classify_player
+    COMPARISON_METRICS,
+    MAX_COMPARED_PLAYERS,
+    TIMELINE_WINDOWS,
+    calculate_player_comparison,
+    plot_comparison_timeline,
+    classify_player,
+    load_squad_classification,
+    load_timeline
 )
 from functions.metrics.speed_metrics import get_speed_metrics
 from functions.metrics.acceleration_metrics import get_acceleration_metrics
 from functions.metrics.distance_metrics import get_distance_metrics
 from functions.metrics.performance_metrics import get_performance_summary
-from functions.team_analysis import calculate_team_metrics, plot_team_metrics
+from functions.risk_analysis import get_squad_risk, load_risk
+from functions.team_analysis import (
+    HEATMAP_METRICS,
+    build_squad_heatmap,
+    get_team_session,
+    load_squad_features,
+    load_team_figures,
+    load_team_metrics,
+    plot_squad_heatmap
+)
+
+# GPS data shown by the dashboard
+DATA_PATH = "data/data.csv"
+
+# Sections of the player page, in display order
+PLAYER_SECTIONS = [
+    "Speed Metrics",
+    "Acceleration & Deceleration",
+    "Distance Metrics",
+    "Performance Metrics",
+    "Other"
+]
 
 # Page configuration
 st.set_page_config(page_title="GPS Analysis Platform", layout="wide", page_icon='assets/logo.png')
@@ -24,7 +54,7 @@ st.set_page_config(page_title="GPS Analysis Platform", layout="wide", page_icon=
 with open('assets/style.css') as f:
     st.markdown(f'<style>{f.read()}</style>', unsafe_allow_html=True)
 
-def render_speed_tab(df, player_name, session_data, selected_date, selected_microcycle):
+def render_speed_tab(df, player_name, session_data, selected_date, selected_microcycle, days):
     """Render speed metrics tab content."""
     speed_metrics = get_speed_metrics(df, player_name, session_data)
     col1, col2, col3, col4 = st.columns(4)
@@ -38,11 +68,11 @@ def render_speed_tab(df, player_name, session_data, selected_date, selected_micr
         st.metric("Season Max Speed (km/h)", f"{speed_metrics['Max Speed Season']:.1f}")
     
     st.plotly_chart(
-        plot_speed_timeline(df, player_name, selected_date, selected_microcycle),
+        load_timeline("speed", DATA_PATH, player_name, selected_date, selected_microcycle, days),
         use_container_width=True
     )
 
-def render_acceleration_tab(df, player_name, session_data, selected_date, selected_microcycle):
+def render_acceleration_tab(df, player_name, session_data, selected_date, selected_microcycle, days):
     """Render acceleration metrics tab content."""
     accel_metrics = get_acceleration_metrics(df, player_name, session_data)
     col1, col2, col3, col4 = st.columns(4)
@@ -56,11 +86,11 @@ def render_acceleration_tab(df, player_name, session_data, selected_date, select
         st.metric("Relative Deceleration (%)", f"{accel_metrics['DEC_Rel']:.1f}")
     
     st.plotly_chart(
-        plot_acceleration_timeline(df, player_name, selected_date, selected_microcycle),
+        load_timeline("acceleration", DATA_PATH, player_name, selected_date, selected_microcycle, days),
         use_container_width=True
     )
 
-def render_distance_tab(df, player_name, session_data, selected_date, selected_microcycle):
+def render_distance_tab(df, player_name, session_data, selected_date, selected_microcycle, days):
     """Render distance metrics tab content."""
     distance_metrics = get_distance_metrics(df, player_name, session_data)
     col1, col2 = st.columns(2)
@@ -70,11 +100,11 @@ def render_distance_tab(df, player_name, session_data, selected_date, selected_m
         st.metric("Relative Distance (%)", f"{distance_metrics['TD_Rel']:.1f}")
     
     st.plotly_chart(
-        plot_distance_timeline(df, player_name, selected_date, selected_microcycle),
+        load_timeline("distance", DATA_PATH, player_name, selected_date, selected_microcycle, days),
         use_container_width=True
     )
 
-def render_performance_tab(df, player_name, session_data, selected_date, selected_microcycle):
+def render_performance_tab(df, player_name, session_data, selected_date, selected_microcycle, days):
     """Render performance metrics tab content."""
     perf_metrics = get_performance_summary(session_data)
     col1, col2, col3 = st.columns(3)
@@ -86,37 +116,96 @@ def render_performance_tab(df, player_name, session_data, selected_date, selecte
         st.metric("+25 km/h", perf_metrics['+25 Km/h'])
     
     st.plotly_chart(
-        plot_performance_timeline(df, player_name, selected_date, selected_microcycle),
+        load_timeline("performance", DATA_PATH, player_name, selected_date, selected_microcycle, days),
         use_container_width=True
     )
 
-def render_other_tab(df, player_name, session_data):
+def render_other_tab(squad_classification, player_name, session_data):
     """Render other metrics tab content."""
-    perf_metrics = get_performance_summary(session_data)
+    perf_metrics = get_performance_summary(session_data, load_risk())
+    injury_index = perf_metrics['injury_prevention_index']
     col1, col2, col3 = st.columns(3)
     with col1:
         st.metric("Minutes", perf_metrics['Mins'])
     with col2:
-        st.metric("Player Classification", classify_player(df, player_name))
+        st.metric("Player Classification", classify_player(squad_classification, player_name))
     with col3:
-        st.metric("Injury Prevention Index", perf_metrics['injury_prevention_index'])
+        st.metric(
+            "Injury Prevention Index",
+            "N/A" if injury_index is None else f"{injury_index:.1f}"
+        )
+
+def render_squad_risk():
+    """Render the risk index of every player on the latest scored date."""
+    squad_risk = get_squad_risk(load_risk())
+    
+    st.header("Squad Injury Risk")
+    if squad_risk.empty:
+        st.info("No scoring output found (results_*.xlsx).")
+        return
+    
+    st.caption(f"Latest scored session: {squad_risk['Date'].iloc[0].strftime('%Y %B %d')}")
+    st.dataframe(squad_risk.drop(columns='Date'), hide_index=True, use_container_width=True)
+
+def render_squad_heatmap(selected_date):
+    """Render the players x days heatmap of the squad up to the selected date."""
+    st.header("Squad Heatmap")
+    col1, col2 = st.columns(2)
+    with col1:
+        metric = st.selectbox("Heatmap Metric", list(HEATMAP_METRICS))
+    with col2:
+        days = st.slider("Days", min_value=7, max_value=56, value=28, step=7)
+    
+    heatmap = build_squad_heatmap(load_squad_features(DATA_PATH), selected_date, days)
+    st.plotly_chart(plot_squad_heatmap(heatmap, metric), use_container_width=True)
+
+def render_player_comparison(df, player_index):
+    """Render summaries and overlaid timelines of several players over a date range."""
+    first_date = df['DATE'].min().date()
+    last_date = df['DATE'].max().date()
+    # Last six weeks, or the whole data when it covers less
+    start_date = max(first_date, last_date - timedelta(days=42))
+    col1, col2 = st.columns(2)
+    with col1:
+        player_names = st.multiselect(
+            "Select Players",
+            sorted(df['PlayerID'].unique()),
+            max_selections=MAX_COMPARED_PLAYERS
+        )
+    with col2:
+        date_range = st.date_input(
+            "Date Range",
+            value=(start_date, last_date),
+            min_value=first_date,
+            max_value=last_date
+        )
+    
+    # The range is incomplete while the end date is being picked
+    if not player_names or len(date_range) != 2:
+        st.info("Select players and a date range to compare.")
+        return
+    
+    window_data = players_window(player_index, player_names, *date_range)
+    if window_data.empty:
+        st.warning("No sessions for the selected players and dates.")
+        return
+    
+    st.dataframe(calculate_player_comparison(window_data), use_container_width=True)
+    
+    metric = st.selectbox("Timeline Metric", COMPARISON_METRICS)
+    st.plotly_chart(plot_comparison_timeline(window_data, metric), use_container_width=True)
 
-def get_player_session_options(df, player_name):
+def get_player_session_options(player_index, player_name):
     """Get session options for a specific player sorted by date in descending order."""
-    player_sessions = df[df['PlayerID'] == player_name][['DATE', 'Microcycle']].drop_duplicates()
-    player_sessions = player_sessions.sort_values('DATE', ascending=False)
-    player_sessions['date_label'] = player_sessions.apply(
-        lambda x: f"{x['DATE'].strftime('%Y %B %d')} - {x['Microcycle']}", axis=1
-    )
+    # Player rows are already sorted by date in the index
+    player_sessions = player_rows(player_index, player_name)[['DATE', 'Microcycle', 'date_label']]
+    player_sessions = player_sessions.drop_duplicates().iloc[::-1]
     return player_sessions
 
 def get_sorted_session_options(df):
     """Get all session options sorted by date in descending order."""
-    session_options = df[['DATE', 'Microcycle']].drop_duplicates()
+    session_options = df[['DATE', 'Microcycle', 'date_label']].drop_duplicates()
     session_options = session_options.sort_values('DATE', ascending=False)
-    session_options['date_label'] = session_options.apply(
-        lambda x: f"{x['DATE'].strftime('%Y %B %d')} - {x['Microcycle']}", axis=1
-    )
     return session_options
 
 def main():
@@ -125,7 +214,8 @@ def main():
     
     try:
         # Load data
-        df = load_and_prepare_data("data/data.csv")
+        df = load_data(DATA_PATH)
+        player_index = load_player_index(DATA_PATH)
         
         # Show menu
         choice = show_menu()
@@ -133,64 +223,67 @@ def main():
         if choice == "Player Analysis":
             st.title("Player Physical Profile Analysis")
             
-            # Player selection
-            player_name = st.selectbox("Select Player", sorted(df['PlayerID'].unique()))
+            # Compare several players or analyse one session
+            mode = st.radio("Mode", ["Single Player", "Compare Players"], horizontal=True)
             
-            # Get sessions for selected player
-            player_sessions = get_player_session_options(df, player_name)
+            if mode == "Compare Players":
+                render_player_comparison(df, player_index)
+            else:
+                # Player selection
+                player_name = st.selectbox("Select Player", sorted(df['PlayerID'].unique()))
+            
+                # Get sessions for selected player
+                player_sessions = get_player_session_options(player_index, player_name)
             
-            if not player_sessions.empty:
-                # Session selection with sorted dates
-                selected_session = st.selectbox(
-                    "Select Session",
-                    player_sessions['date_label']
-                )
+                if not player_sessions.empty:
+                    # Session selection with sorted dates
+                    selected_session = st.selectbox(
+                        "Select Session",
+                        player_sessions['date_label']
+                    )
                 
-                selected_date = player_sessions[
-                    player_sessions['date_label'] == selected_session
-                ]['DATE'].iloc[0].date()
-                selected_microcycle = player_sessions[
-                    player_sessions['date_label'] == selected_session
-                ]['Microcycle'].iloc[0]
+                    selected_date = player_sessions[
+                        player_sessions['date_label'] == selected_session
+                    ]['DATE'].iloc[0].date()
+                    selected_microcycle = player_sessions[
+                        player_sessions['date_label'] == selected_session
+                    ]['Microcycle'].iloc[0]
                 
-                # Get session data
-                session_data = df[
-                    (df['DATE'].dt.date == selected_date) & 
-                    (df['Microcycle'] == selected_microcycle) &
-                    (df['PlayerID'] == player_name)
-                ]
+                    # Get session data
+                    player_day = player_window(player_index, player_name, selected_date, selected_date)
+                    session_data = player_day[player_day['Microcycle'] == selected_microcycle]
                 
-                if not session_data.empty:
-                    # Create tabs with custom CSS class
-                    st.markdown('<div class="stTab">', unsafe_allow_html=True)
-                    speed_tab, accel_tab, distance_tab, perf_tab, other_tab = st.tabs([
-                        "Speed Metrics",
-                        "Acceleration & Deceleration",
-                        "Distance Metrics",
-                        "Performance Metrics",
-                        "Other"
-                    ])
-                    st.markdown('</div>', unsafe_allow_html=True)
-                    
-                    # Render content for each tab
-                    with speed_tab:
-                        render_speed_tab(df, player_name, session_data, selected_date, selected_microcycle)
-                    
-                    with accel_tab:
-                        render_acceleration_tab(df, player_name, session_data, selected_date, selected_microcycle)
+                    if not session_data.empty:
+                        # Timeline window shared by every tab
+                        window = st.radio("Timeline Window", list(TIMELINE_WINDOWS), horizontal=True)
+                        days = TIMELINE_WINDOWS[window]
                     
-                    with distance_tab:
-                        render_distance_tab(df, player_name, session_data, selected_date, selected_microcycle)
+                        # One section at a time: switching reruns the page and only
+                        # the selected section's figures are built
+                        section = st.radio(
+                            "Section",
+                            PLAYER_SECTIONS,
+                            horizontal=True,
+                            key="player_tab",
+                            label_visibility="collapsed"
+                        )
                     
-                    with perf_tab:
-                        render_performance_tab(df, player_name, session_data, selected_date, selected_microcycle)
-                    
-                    with other_tab:
-                        render_other_tab(df, player_name, session_data)
+                        if section == "Speed Metrics":
+                            render_speed_tab(df, player_name, session_data, selected_date, selected_microcycle, days)
+                        elif section == "Acceleration & Deceleration":
+                            render_acceleration_tab(df, player_name, session_data, selected_date, selected_microcycle, days)
+                        elif section == "Distance Metrics":
+                            render_distance_tab(df, player_name, session_data, selected_date, selected_microcycle, days)
+                        elif section == "Performance Metrics":
+                            render_performance_tab(df, player_name, session_data, selected_date, selected_microcycle, days)
+                        else:
+                            render_other_tab(
+                                load_squad_classification(DATA_PATH), player_name, session_data
+                            )
+                    else:
+                        st.warning("No data available for the selected player and session.")
                 else:
-                    st.warning("No data available for the selected player and session.")
-            else:
-                st.warning("No sessions available for the selected player.")
+                    st.warning("No sessions available for the selected player.")
                 
         else:  # Team Analysis
             st.title("Team GPS Analysis")
@@ -209,9 +302,9 @@ def main():
                 session_options['date_label'] == selected_session
             ]['Microcycle'].iloc[0]
             
-            # Calculate team metrics
-            # Calculate team metrics
-            team_metrics = calculate_team_metrics(df, selected_date, selected_microcycle)
+            # Team metrics of every session, aggregated once per data version
+            team_table = load_team_metrics(DATA_PATH)
+            team_metrics = get_team_session(team_table, selected_date, selected_microcycle)
             
             if not team_metrics.empty:
                 # Display team metrics
@@ -232,12 +325,12 @@ def main():
                 
                 # Team visualizations
                 st.header("Team Performance Visualizations")
-                fig_team_distance, fig_team_sprints = plot_team_metrics(
-                    calculate_team_metrics(df),
-                    selected_date
-                )
+                fig_team_distance, fig_team_sprints = load_team_figures(DATA_PATH, selected_date)
                 st.plotly_chart(fig_team_distance, use_container_width=True)
                 st.plotly_chart(fig_team_sprints, use_container_width=True)
+                
+                render_squad_risk()
+                render_squad_heatmap(selected_date)
             else:
                 st.warning("No team data available for the selected session.")
     
@@ -1,41 +1,115 @@
-import pandas as pd
+import os
+
 import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Metric columns stored as float32; everything in the CSV but these is a metric
+NON_METRIC_COLUMNS = ['DATE', 'Microcycle', 'PlayerID']
 
 """
-Load and prepare GPS data with proper date conversion.
+Load and prepare GPS data with proper date conversion and compact dtypes.
 """
 def load_and_prepare_data(data_path):
     
     try:
         
-        # Import data
-        df = pd.read_csv(data_path)
-        
-        # Create a copy to avoid modifying the original dataframe
-        processed_df = df.copy()
+        # Import data, parsing dates and categories on read
+        processed_df = pd.read_csv(
+            data_path,
+            parse_dates=['DATE'],
+            dtype={'Microcycle': 'category'}
+        )
         
         # Convert PlayerID to int
-        processed_df['PlayerID'] = processed_df['PlayerID'].astype(int)
+        processed_df['PlayerID'] = processed_df['PlayerID'].astype(np.int32)
         
-        # Convert date to datetime pandas object
-        processed_df['DATE'] = pd.to_datetime(processed_df['DATE'])
+        # Downcast every metric to float32
+        metric_columns = [col for col in processed_df.columns if col not in NON_METRIC_COLUMNS]
+        processed_df[metric_columns] = processed_df[metric_columns].astype(np.float32)
         
-        # Test data is being imported correcty
-        print(f"Processed columns: {processed_df.columns.tolist()}")
-        print(f"Number of rows: {len(processed_df)}")
-        print(f"Sample of processed data:\n{processed_df.head()}")
-        print(f"Data types:\n{processed_df.dtypes}")
-        print(f"Unique player names: {processed_df['PlayerID'].unique()}")
+        # Session label of every row, formatted once for selectors and charts
+        processed_df['date_label'] = format_date_microcycle_labels(
+            processed_df['DATE'], processed_df['Microcycle']
+        )
         
         return processed_df
     
     except FileNotFoundError:
-        print(f"File not found: {data_path}")
         raise FileNotFoundError(f"Data file not found at {data_path}")
     except Exception as e:
-        print(f"Error processing data: {str(e)}")
         raise Exception(f"Error processing data: {str(e)}")
 
+"""
+Version of the data file: its mtime and size.
+Part of every cache key derived from the data, so editing the CSV
+invalidates them all on the next rerun.
+"""
+def data_version(data_path):
+    try:
+        stat = os.stat(data_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Data file not found at {data_path}")
+    
+    return stat.st_mtime_ns, stat.st_size
+
+"""
+Parse the data file once per version of the file, evicting the previous one.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_data(data_path, version):
+    return load_and_prepare_data(data_path)
+
+"""
+Load the GPS data shared by every session of the app.
+The frame is the same object for all users, so it is read-only: copy it
+before adding or modifying columns.
+"""
+def load_data(data_path):
+    return load_cached_data(data_path, data_version(data_path))
+
+"""
+Index the data by player: rows sorted by (PlayerID, DATE) and the
+[start, end) row range of every player, so a player's sessions are a
+slice and a date window two binary searches.
+"""
+def build_player_index(df):
+    sorted_df = df.sort_values(['PlayerID', 'DATE'], kind='stable').reset_index(drop=True)
+    
+    players, starts = np.unique(sorted_df['PlayerID'].to_numpy(), return_index=True)
+    ends = np.append(starts[1:], len(sorted_df))
+    
+    return {
+        'df': sorted_df,
+        'dates': sorted_df['DATE'].to_numpy(),
+        'offsets': {int(player): (start, end) for player, start, end in zip(players, starts, ends)}
+    }
+
+"""
+Player index of the data file, built once per version of the file.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_player_index(data_path, version):
+    return build_player_index(load_cached_data(data_path, version))
+
+def load_player_index(data_path):
+    """Shared, read-only player index of the data file."""
+    return load_cached_player_index(data_path, data_version(data_path))
+
+def player_rows(player_index, player_name):
+    """All sessions of a player sorted by date, as a view of the index."""
+    start, end = player_index['offsets'].get(int(player_name), (0, 0))
+    return player_index['df'].iloc[start:end]
+
+def player_window(player_index, player_name, start_date, end_date):
+    """Sessions of a player between two dates (inclusive) sorted by date."""
+    start, end = player_index['offsets'].get(int(player_name), (0, 0))
+    dates = player_index['dates'][start:end]
+    
+    first = start + dates.searchsorted(pd.Timestamp(start_date).to_datetime64(), side='left')
+    last = start + dates.searchsorted(pd.Timestamp(end_date).to_datetime64(), side='right')
+    return player_index['df'].iloc[first:last]
+
 def filter_data_by_date_range(df, start_date, end_date):
     """Filter dataframe by date range."""
     start_date = pd.to_datetime(start_date)
@@ -43,8 +117,32 @@ def filter_data_by_date_range(df, start_date, end_date):
     dates = (df['DATE'] >= start_date) & (df['DATE'] <= end_date)
     return df[dates]
 
+def players_window(player_index, player_names, start_date, end_date):
+    """Sessions of several players between two dates, gathered in one selection."""
+    start = pd.Timestamp(start_date).to_datetime64()
+    end = pd.Timestamp(end_date).to_datetime64()
+    dates = player_index['dates']
+    
+    ranges = []
+    for player_name in player_names:
+        first, last = player_index['offsets'].get(int(player_name), (0, 0))
+        ranges.append(np.arange(
+            first + dates[first:last].searchsorted(start, side='left'),
+            first + dates[first:last].searchsorted(end, side='right')
+        ))
+    
+    positions = np.concatenate(ranges) if ranges else np.empty(0, dtype=int)
+    return player_index['df'].iloc[positions]
+
 """
 Format date and microcycle in the desired format.
 """
 def format_date_microcycle(date, microcycle):
     return f"{date.strftime('%Y %B %d')} - {microcycle}"
+
+"""
+Vectorized format_date_microcycle for whole columns, as a categorical.
+"""
+def format_date_microcycle_labels(dates, microcycles):
+    labels = dates.dt.strftime('%Y %B %d') + ' - ' + microcycles.astype(str)
+    return labels.astype('category')
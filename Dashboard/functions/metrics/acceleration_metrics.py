@@ -1,6 +1,14 @@
 import pandas as pd
 import numpy as np
 
+# Aggregation of every acceleration metric in a summary
+ACCELERATION_SUMMARY = {
+    'ACC': 'max',
+    'DEC': 'min',
+    'ACC_Rel': 'mean',
+    'DEC_Rel': 'mean'
+}
+
 def get_acceleration_metrics(df, player_name, session_data):
     """Get acceleration metrics for a player's session."""
     if session_data.empty:
@@ -18,8 +26,11 @@ def get_acceleration_metrics(df, player_name, session_data):
         'DEC_Rel': float(session_data['DEC_Rel'].iloc[0])
     }
 
-def get_acceleration_summary(session_data):
-    """Get acceleration-related metrics summary."""
+def get_acceleration_summary(session_data, by=None):
+    """Get acceleration-related metrics summary, one row per `by` group when given."""
+    if by is not None:
+        return session_data.groupby(by, observed=True).agg(ACCELERATION_SUMMARY)
+    
     if session_data.empty:
         return {
             'ACC': 0.0,
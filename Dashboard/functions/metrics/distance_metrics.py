@@ -1,6 +1,12 @@
 import pandas as pd
 import numpy as np
 
+# Aggregation of every distance metric in a summary
+DISTANCE_SUMMARY = {
+    'TD': 'sum',
+    'TD_Rel': 'mean'
+}
+
 def get_distance_metrics(df, player_name, session_data):
     """Get distance metrics for a player's session."""
     if session_data.empty:
@@ -14,8 +20,11 @@ def get_distance_metrics(df, player_name, session_data):
         'TD_Rel': float(session_data['TD_Rel'].iloc[0])
     }
 
-def get_distance_summary(session_data):
-    """Get distance-related metrics summary."""
+def get_distance_summary(session_data, by=None):
+    """Get distance-related metrics summary, one row per `by` group when given."""
+    if by is not None:
+        return session_data.groupby(by, observed=True).agg(DISTANCE_SUMMARY)
+    
     if session_data.empty:
         return {
             'TD': 0.0,
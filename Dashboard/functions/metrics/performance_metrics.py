@@ -1,17 +1,29 @@
 import pandas as pd
 import numpy as np
+from functions.risk_analysis import get_injury_index
 
-def calculate_injury_prevention_index(session_data):
-    """Calculate injury prevention index (placeholder)."""
+# Aggregation of every performance metric in a summary
+PERFORMANCE_SUMMARY = {
+    'Sprints': 'sum',
+    'HSR': 'sum',
+    '+25 Km/h': 'sum',
+    'Mins': 'max'
+}
+
+def calculate_injury_prevention_index(session_data, risk=None):
+    """Injury risk index of the session in the latest scoring output, None when not scored."""
     if session_data.empty:
         return 0
     
-    # Placeholder implementation
-    # TODO: Implement actual injury prevention calculation logic
-    return 0
+    return get_injury_index(
+        risk, session_data['PlayerID'].iloc[0], session_data['DATE'].iloc[0]
+    )
 
-def get_performance_summary(session_data):
-    """Get general performance metrics summary."""
+def get_performance_summary(session_data, risk=None, by=None):
+    """Get general performance metrics summary, one row per `by` group when given."""
+    if by is not None:
+        return session_data.groupby(by, observed=True).agg(PERFORMANCE_SUMMARY)
+    
     if session_data.empty:
         return {
             'Sprints': 0,
@@ -26,5 +38,5 @@ def get_performance_summary(session_data):
         'HSR': int(session_data['HSR'].sum()),
         '+25 Km/h': int(session_data['+25 Km/h'].sum()),
         'Mins': int(session_data['Mins'].max()),
-        'injury_prevention_index': calculate_injury_prevention_index(session_data)
+        'injury_prevention_index': calculate_injury_prevention_index(session_data, risk)
     }
\ No newline at end of file
@@ -1,6 +1,14 @@
 import pandas as pd
 import numpy as np
 
+# Aggregation of every speed metric in a summary
+SPEED_SUMMARY = {
+    'Max Speed': 'max',
+    'Avg Speed Season': 'mean',
+    '% Max Speed': 'mean',
+    'Max Speed Season': 'max'
+}
+
 def get_speed_metrics(df, player_name, session_data):
     """Get speed metrics for a player's session."""
     if session_data.empty:
@@ -18,8 +26,11 @@ def get_speed_metrics(df, player_name, session_data):
         'Max Speed Season': float(session_data['Max Speed Season'].iloc[0])
     }
 
-def get_speed_summary(session_data):
-    """Get speed-related metrics summary."""
+def get_speed_summary(session_data, by=None):
+    """Get speed-related metrics summary, one row per `by` group when given."""
+    if by is not None:
+        return session_data.groupby(by, observed=True).agg(SPEED_SUMMARY)
+    
     if session_data.empty:
         return {
             'Max Speed': 0.0,
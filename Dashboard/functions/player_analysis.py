@@ -1,7 +1,18 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import streamlit as st
 from datetime import timedelta
-from functions.data_processing import format_date_microcycle
+from functions.data_processing import (
+    data_version,
+    load_cached_data,
+    load_cached_player_index,
+    player_window
+)
+from functions.metrics.acceleration_metrics import get_acceleration_summary
+from functions.metrics.distance_metrics import get_distance_summary
+from functions.metrics.performance_metrics import get_performance_summary
+from functions.metrics.speed_metrics import get_speed_summary
 
 # Define color scheme
 COLORS = {
@@ -12,25 +23,92 @@ COLORS = {
     'max_line': 'black'      # Black line for max values
 }
 
-def plot_speed_timeline(df, player_name, selected_date, selected_microcycle):
-    """Create speed timeline visualization."""
+# Metrics compared with the squad to classify a player
+CLASSIFICATION_METRICS = ['Max Speed', 'TD']
+
+# Figures kept in memory, the least recently used is evicted first
+FIGURE_CACHE_SIZE = 128
+
+# Timeline windows in days before the selected session, None for the season
+TIMELINE_WINDOWS = {
+    'Last 7 days': 7,
+    'Last 6 weeks': 42,
+    'Season': None
+}
+
+# Most players in one comparison
+MAX_COMPARED_PLAYERS = 25
+
+# Metrics that can be overlaid in the comparison timeline
+COMPARISON_METRICS = ['Max Speed', 'TD', 'HSR', '+25 Km/h', 'Sprints', 'ACC', 'DEC', '% Max Speed']
+
+# Seasons start on the first day of this month
+SEASON_START_MONTH = 7
+
+# Most sessions drawn in one timeline, longer windows are downsampled
+MAX_TIMELINE_POINTS = 120
+
+def get_season_start(date):
+    """First day of the season that contains date."""
+    season_year = date.year if date.month >= SEASON_START_MONTH else date.year - 1
+    return pd.Timestamp(season_year, SEASON_START_MONTH, 1)
+
+def downsample_timeline(timeline_data, columns, is_selected, max_points=MAX_TIMELINE_POINTS):
+    """
+    Keep at most about max_points sessions, preserving the extremes.
+    Sessions are split into equal buckets and only the minimum and maximum
+    of every plotted column are kept in each, plus the selected session.
+    """
+    n_sessions = len(timeline_data)
+    n_buckets = max_points // (2 * len(columns))
+    if n_sessions <= max_points or n_buckets == 0:
+        return timeline_data, is_selected
+    
+    buckets = np.arange(n_sessions) * n_buckets // n_sessions
+    bucket_starts = np.searchsorted(buckets, np.arange(n_buckets))
+    bucket_ends = np.append(bucket_starts[1:], n_sessions) - 1
+    
+    keep = is_selected.to_numpy().copy()
+    for col in columns:
+        values = timeline_data[col].to_numpy(dtype=float)
+        # Missing values sort past the extreme being kept
+        for fill, bucket_edge in ((np.inf, bucket_starts), (-np.inf, bucket_ends)):
+            order = np.lexsort((np.where(np.isnan(values), fill, values), buckets))
+            keep[order[bucket_edge]] = True
+    
+    return timeline_data[keep], is_selected[keep]
+
+def get_timeline_data(player_index, player_name, selected_date, selected_microcycle, days=7, columns=None):
+    """
+    Player sessions up to the selected date, their labels and the
+    selected-session mask. days=None covers the whole season; long windows
+    are downsampled to the extremes of the plotted columns.
+    """
     selected_date = pd.to_datetime(selected_date)
-    start_date = selected_date - timedelta(days=7)
+    if days is None:
+        start_date = get_season_start(selected_date)
+    else:
+        start_date = selected_date - timedelta(days=days)
     
-    timeline_data = df[
-        (df['PlayerID'] == player_name) & 
-        (df['DATE'] >= start_date) & 
-        (df['DATE'] <= selected_date)
-    ].copy()
+    # Slice of the player index, sorted by date, no scan or copy
+    timeline_data = player_window(player_index, player_name, start_date, selected_date)
     
-    timeline_data = timeline_data.sort_values('DATE')
-    timeline_data['is_selected'] = (
+    is_selected = (
         (timeline_data['DATE'].dt.date == selected_date.date()) & 
         (timeline_data['Microcycle'] == selected_microcycle)
     )
     
-    timeline_data['date_label'] = timeline_data.apply(
-        lambda x: format_date_microcycle(x['DATE'], x['Microcycle']), axis=1
+    if columns:
+        timeline_data, is_selected = downsample_timeline(timeline_data, columns, is_selected)
+    
+    date_labels = timeline_data['date_label']
+    
+    return timeline_data, date_labels, is_selected
+
+def plot_speed_timeline(player_index, player_name, selected_date, selected_microcycle, days=7):
+    """Create speed timeline visualization."""
+    timeline_data, date_labels, is_selected = get_timeline_data(
+        player_index, player_name, selected_date, selected_microcycle, days, ['Max Speed']
     )
     
     all_time_max = timeline_data['Max Speed Season'].iloc[0]
@@ -39,7 +117,8 @@ def plot_speed_timeline(df, player_name, selected_date, selected_microcycle):
     
     # Add continuous line for all sessions
     fig.add_trace(go.Scatter(
-        x=timeline_data['date_label'],
+        x=timeline_data['DATE'],
+        text=date_labels,
         y=timeline_data['Max Speed'],
         name='Max Speed',
         line=dict(color=COLORS['primary']),
@@ -47,10 +126,11 @@ def plot_speed_timeline(df, player_name, selected_date, selected_microcycle):
     ))
     
     # Add star marker for selected session
-    selected = timeline_data[timeline_data['is_selected']]
+    selected = timeline_data[is_selected]
     if not selected.empty:
         fig.add_trace(go.Scatter(
-            x=selected['date_label'],
+            x=selected['DATE'],
+            text=date_labels[is_selected],
             y=selected['Max Speed'],
             name='Selected Session',
             mode='markers',
@@ -68,7 +148,7 @@ def plot_speed_timeline(df, player_name, selected_date, selected_microcycle):
     
     fig.update_layout(
         title='Speed Timeline',
-        xaxis_title='Session',
+        xaxis_title='Date',
         yaxis_title='Speed (km/h)',
         showlegend=True,
         hovermode='x unified',
@@ -80,32 +160,18 @@ def plot_speed_timeline(df, player_name, selected_date, selected_microcycle):
     
     return fig
 
-def plot_acceleration_timeline(df, player_name, selected_date, selected_microcycle):
+def plot_acceleration_timeline(player_index, player_name, selected_date, selected_microcycle, days=7):
     """Create acceleration/deceleration timeline visualization."""
-    selected_date = pd.to_datetime(selected_date)
-    start_date = selected_date - timedelta(days=7)
-    
-    timeline_data = df[
-        (df['PlayerID'] == player_name) & 
-        (df['DATE'] >= start_date) & 
-        (df['DATE'] <= selected_date)
-    ].copy()
-    
-    timeline_data = timeline_data.sort_values('DATE')
-    timeline_data['is_selected'] = (
-        (timeline_data['DATE'].dt.date == selected_date.date()) & 
-        (timeline_data['Microcycle'] == selected_microcycle)
-    )
-    
-    timeline_data['date_label'] = timeline_data.apply(
-        lambda x: format_date_microcycle(x['DATE'], x['Microcycle']), axis=1
+    timeline_data, date_labels, is_selected = get_timeline_data(
+        player_index, player_name, selected_date, selected_microcycle, days, ['ACC', 'DEC']
     )
     
     fig = go.Figure()
     
     # Add continuous lines for acceleration and deceleration
     fig.add_trace(go.Scatter(
-        x=timeline_data['date_label'],
+        x=timeline_data['DATE'],
+        text=date_labels,
         y=timeline_data['ACC'],
         name='Max Acceleration',
         line=dict(color=COLORS['primary']),
@@ -113,7 +179,8 @@ def plot_acceleration_timeline(df, player_name, selected_date, selected_microcyc
     ))
     
     fig.add_trace(go.Scatter(
-        x=timeline_data['date_label'],
+        x=timeline_data['DATE'],
+        text=date_labels,
         y=timeline_data['DEC'],
         name='Max Deceleration',
         line=dict(color=COLORS['secondary']),
@@ -121,10 +188,11 @@ def plot_acceleration_timeline(df, player_name, selected_date, selected_microcyc
     ))
     
     # Add star markers for selected session
-    selected = timeline_data[timeline_data['is_selected']]
+    selected = timeline_data[is_selected]
     if not selected.empty:
         fig.add_trace(go.Scatter(
-            x=selected['date_label'],
+            x=selected['DATE'],
+            text=date_labels[is_selected],
             y=selected['ACC'],
             name='Selected Session (Accel)',
             mode='markers',
@@ -132,7 +200,8 @@ def plot_acceleration_timeline(df, player_name, selected_date, selected_microcyc
             showlegend=True
         ))
         fig.add_trace(go.Scatter(
-            x=selected['date_label'],
+            x=selected['DATE'],
+            text=date_labels[is_selected],
             y=selected['DEC'],
             name='Selected Session (Decel)',
             mode='markers',
@@ -142,7 +211,7 @@ def plot_acceleration_timeline(df, player_name, selected_date, selected_microcyc
     
     fig.update_layout(
         title='Acceleration Timeline',
-        xaxis_title='Session',
+        xaxis_title='Date',
         yaxis_title='Acceleration (m/s²)',
         showlegend=True,
         hovermode='x unified',
@@ -154,25 +223,10 @@ def plot_acceleration_timeline(df, player_name, selected_date, selected_microcyc
     
     return fig
 
-def plot_distance_timeline(df, player_name, selected_date, selected_microcycle):
+def plot_distance_timeline(player_index, player_name, selected_date, selected_microcycle, days=7):
     """Create distance timeline visualization."""
-    selected_date = pd.to_datetime(selected_date)
-    start_date = selected_date - timedelta(days=7)
-    
-    timeline_data = df[
-        (df['PlayerID'] == player_name) & 
-        (df['DATE'] >= start_date) & 
-        (df['DATE'] <= selected_date)
-    ].copy()
-    
-    timeline_data = timeline_data.sort_values('DATE')
-    timeline_data['is_selected'] = (
-        (timeline_data['DATE'].dt.date == selected_date.date()) & 
-        (timeline_data['Microcycle'] == selected_microcycle)
-    )
-    
-    timeline_data['date_label'] = timeline_data.apply(
-        lambda x: format_date_microcycle(x['DATE'], x['Microcycle']), axis=1
+    timeline_data, date_labels, is_selected = get_timeline_data(
+        player_index, player_name, selected_date, selected_microcycle, days, ['TD']
     )
     
     all_time_max = timeline_data['TD'].max()
@@ -181,7 +235,8 @@ def plot_distance_timeline(df, player_name, selected_date, selected_microcycle):
     
     # Add continuous line for all sessions
     fig.add_trace(go.Scatter(
-        x=timeline_data['date_label'],
+        x=timeline_data['DATE'],
+        text=date_labels,
         y=timeline_data['TD'],
         name='Total Distance',
         line=dict(color=COLORS['primary']),
@@ -189,10 +244,11 @@ def plot_distance_timeline(df, player_name, selected_date, selected_microcycle):
     ))
     
     # Add star marker for selected session
-    selected = timeline_data[timeline_data['is_selected']]
+    selected = timeline_data[is_selected]
     if not selected.empty:
         fig.add_trace(go.Scatter(
-            x=selected['date_label'],
+            x=selected['DATE'],
+            text=date_labels[is_selected],
             y=selected['TD'],
             name='Selected Session',
             mode='markers',
@@ -210,7 +266,7 @@ def plot_distance_timeline(df, player_name, selected_date, selected_microcycle):
     
     fig.update_layout(
         title='Distance Timeline',
-        xaxis_title='Session',
+        xaxis_title='Date',
         yaxis_title='Distance (m)',
         showlegend=True,
         hovermode='x unified',
@@ -222,25 +278,10 @@ def plot_distance_timeline(df, player_name, selected_date, selected_microcycle):
     
     return fig
 
-def plot_performance_timeline(df, player_name, selected_date, selected_microcycle):
+def plot_performance_timeline(player_index, player_name, selected_date, selected_microcycle, days=7):
     """Create performance (sprints) timeline visualization."""
-    selected_date = pd.to_datetime(selected_date)
-    start_date = selected_date - timedelta(days=7)
-    
-    timeline_data = df[
-        (df['PlayerID'] == player_name) & 
-        (df['DATE'] >= start_date) & 
-        (df['DATE'] <= selected_date)
-    ].copy()
-    
-    timeline_data = timeline_data.sort_values('DATE')
-    timeline_data['is_selected'] = (
-        (timeline_data['DATE'].dt.date == selected_date.date()) & 
-        (timeline_data['Microcycle'] == selected_microcycle)
-    )
-    
-    timeline_data['date_label'] = timeline_data.apply(
-        lambda x: format_date_microcycle(x['DATE'], x['Microcycle']), axis=1
+    timeline_data, date_labels, is_selected = get_timeline_data(
+        player_index, player_name, selected_date, selected_microcycle, days, ['Sprints']
     )
     
     all_time_max = timeline_data['Sprints'].max()
@@ -249,7 +290,8 @@ def plot_performance_timeline(df, player_name, selected_date, selected_microcycl
     
     # Add continuous line for all sessions
     fig.add_trace(go.Scatter(
-        x=timeline_data['date_label'],
+        x=timeline_data['DATE'],
+        text=date_labels,
         y=timeline_data['Sprints'],
         name='Total Sprints',
         line=dict(color=COLORS['primary']),
@@ -257,10 +299,11 @@ def plot_performance_timeline(df, player_name, selected_date, selected_microcycl
     ))
     
     # Add star marker for selected session
-    selected = timeline_data[timeline_data['is_selected']]
+    selected = timeline_data[is_selected]
     if not selected.empty:
         fig.add_trace(go.Scatter(
-            x=selected['date_label'],
+            x=selected['DATE'],
+            text=date_labels[is_selected],
             y=selected['Sprints'],
             name='Selected Session',
             mode='markers',
@@ -278,7 +321,7 @@ def plot_performance_timeline(df, player_name, selected_date, selected_microcycl
     
     fig.update_layout(
         title='Sprints Timeline',
-        xaxis_title='Session',
+        xaxis_title='Date',
         yaxis_title='Number of Sprints',
         showlegend=True,
         hovermode='x unified',
@@ -290,17 +333,106 @@ def plot_performance_timeline(df, player_name, selected_date, selected_microcycl
     
     return fig
 
-def classify_player(df, player_name):
-    """Classify player based on their performance metrics."""
-    player_data = df[df['PlayerID'] == player_name]
+def calculate_player_comparison(window_data):
+    """Speed, acceleration, distance and performance summaries of every player in window_data."""
+    return pd.concat([
+        get_speed_summary(window_data, by='PlayerID'),
+        get_acceleration_summary(window_data, by='PlayerID'),
+        get_distance_summary(window_data, by='PlayerID'),
+        get_performance_summary(window_data, by='PlayerID')
+    ], axis=1)
+
+def plot_comparison_timeline(window_data, metric):
+    """Overlay the timeline of one metric for every player in window_data."""
+    fig = go.Figure()
     
-    # Calculate z-scores for key metrics
-    speed_zscore = (player_data['Max Speed'].mean() - df['Max Speed'].mean()) / df['Max Speed'].std()
-    distance_zscore = (player_data['TD'].mean() - df['TD'].mean()) / df['TD'].std()
+    # Rows come sorted by player and date from the player index
+    for player_name, player_data in window_data.groupby('PlayerID', sort=False):
+        fig.add_trace(go.Scatter(
+            x=player_data['DATE'],
+            y=player_data[metric],
+            text=player_data['date_label'],
+            name=str(player_name),
+            mode='lines+markers'
+        ))
     
-    if speed_zscore > 1:
-        return "High Intensity"
-    elif distance_zscore > 1:
-        return "High Distance"
-    else:
-        return "Balanced Performance"
\ No newline at end of file
+    fig.update_layout(
+        title=f'{metric} Comparison',
+        xaxis_title='Date',
+        yaxis_title=metric,
+        showlegend=True,
+        hovermode='x unified',
+        plot_bgcolor=COLORS['background'],
+        paper_bgcolor=COLORS['background'],
+        font=dict(color=COLORS['text'])
+    )
+    
+    return fig
+
+# Timeline builders by name, memoized by load_timeline
+TIMELINE_PLOTS = {
+    'speed': plot_speed_timeline,
+    'acceleration': plot_acceleration_timeline,
+    'distance': plot_distance_timeline,
+    'performance': plot_performance_timeline
+}
+
+"""
+Timeline figure of one session, built once per data version and kept in a
+bounded LRU shared by every session of the app.
+"""
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_SIZE)
+def load_cached_timeline(plot, data_path, version, player_name, selected_date, selected_microcycle, days):
+    player_index = load_cached_player_index(data_path, version)
+    return TIMELINE_PLOTS[plot](player_index, player_name, selected_date, selected_microcycle, days)
+
+def load_timeline(plot, data_path, player_name, selected_date, selected_microcycle, days=7):
+    """Memoized timeline figure ('speed', 'acceleration', 'distance' or 'performance')."""
+    return load_cached_timeline(
+        plot, data_path, data_version(data_path), int(player_name), selected_date, str(selected_microcycle), days
+    )
+
+def calculate_squad_baseline(df):
+    """Squad mean and std of the classification metrics and every player's means."""
+    metrics = df[['PlayerID'] + CLASSIFICATION_METRICS]
+    squad = metrics[CLASSIFICATION_METRICS].astype(float)
+    
+    return {
+        'mean': squad.mean(),
+        'std': squad.std(),
+        'players': squad.groupby(metrics['PlayerID']).mean()
+    }
+
+def classify_squad(baseline):
+    """Classify every player at once from the squad baseline."""
+    zscores = (baseline['players'] - baseline['mean']) / baseline['std']
+    
+    classification = pd.DataFrame({
+        'speed_zscore': zscores['Max Speed'],
+        'distance_zscore': zscores['TD']
+    })
+    classification['Classification'] = np.select(
+        [classification['speed_zscore'] > 1, classification['distance_zscore'] > 1],
+        ["High Intensity", "High Distance"],
+        default="Balanced Performance"
+    )
+    
+    return classification
+
+"""
+Squad classification built once per version of the data file.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_squad_classification(data_path, version):
+    return classify_squad(calculate_squad_baseline(load_cached_data(data_path, version)))
+
+def load_squad_classification(data_path):
+    """Shared, read-only classification of every player, indexed by PlayerID."""
+    return load_cached_squad_classification(data_path, data_version(data_path))
+
+def classify_player(squad_classification, player_name):
+    """Classify player based on their performance metrics."""
+    if player_name not in squad_classification.index:
+        return "Balanced Performance"
+    
+    return squad_classification.loc[player_name, 'Classification']
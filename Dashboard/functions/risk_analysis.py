@@ -0,0 +1,150 @@
+import glob
+import os
+import re
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from functions.data_processing import data_version
+
+# Folders searched for the scoring output (results_*.xlsx): the dashboard
+# data folder and the folder where score.py writes it
+RESULTS_DIRS = ['data', '..']
+
+# Run date in the name of a daily results file (results_dd-mm-YYYY.xlsx),
+# only used for older outputs without a Date column
+RESULTS_DATE = re.compile(r'results_(\d{2}-\d{2}-\d{4})\.xlsx$')
+
+"""
+Every scoring output (results_*.xlsx, daily and backfill) with its
+version, oldest first, so later files win in the merged lookup.
+"""
+def find_results(results_dirs=RESULTS_DIRS):
+    paths = [
+        path
+        for results_dir in results_dirs
+        for path in glob.glob(os.path.join(results_dir, 'results_*.xlsx'))
+    ]
+
+    return tuple(
+        (path, data_version(path))
+        for path in sorted(paths, key=os.path.getmtime)
+    )
+
+"""
+Read the keys and risk index columns of a scoring output as arrays.
+Every row carries its session Date. Daily outputs written before the
+Date column was added only have the run date in the file name, which
+is used as a fallback.
+"""
+def read_results(results_path):
+    header = pd.read_excel(results_path, nrows=0).columns
+    index_columns = [col for col in header if col.startswith('Index')]
+    if not index_columns:
+        raise ValueError(f"No Index column in {results_path}")
+
+    # Only the columns the dashboard uses are parsed
+    results = pd.read_excel(
+        results_path,
+        usecols=['PlayerID'] + (['Date'] if 'Date' in header else []) + index_columns
+    )
+
+    if 'Date' in results.columns:
+        dates = pd.to_datetime(results['Date']).dt.normalize()
+    else:
+        scored_date = RESULTS_DATE.search(os.path.basename(results_path))
+        if scored_date is None:
+            raise ValueError(f"No Date column or dated file name in {results_path}")
+        dates = pd.Series(pd.to_datetime(scored_date.group(1), format='%d-%m-%Y'), index=results.index)
+
+    return {
+        'path': results_path,
+        'players': results['PlayerID'].to_numpy(dtype=np.int64),
+        'dates': dates.to_numpy(dtype='datetime64[ns]'),
+        'index_columns': index_columns,
+        'indexes': results[index_columns].to_numpy(dtype=np.float32)
+    }
+
+"""
+Merge scoring outputs (oldest first) into one set of arrays. A (PlayerID,
+date) scored by several files keeps the index of the newest one, so a
+backfill of past dates neither hides nor outdates the daily outputs.
+"""
+def merge_results(results_list):
+    # Index columns of the newest output first, its first model is the one shown
+    index_columns = list(dict.fromkeys(
+        col for results in reversed(results_list) for col in results['index_columns']
+    ))
+    
+    merged = pd.concat([
+        pd.DataFrame(results['indexes'], columns=results['index_columns']).assign(
+            PlayerID=results['players'], Date=results['dates']
+        )
+        for results in results_list
+    ], ignore_index=True)
+    merged = merged.drop_duplicates(['PlayerID', 'Date'], keep='last')
+    
+    return {
+        'paths': [results['path'] for results in results_list],
+        'players': merged['PlayerID'].to_numpy(dtype=np.int64),
+        'dates': merged['Date'].to_numpy(dtype='datetime64[ns]'),
+        'index_columns': index_columns,
+        'indexes': merged[index_columns].to_numpy(dtype=np.float32)
+    }
+
+"""
+Risk lookup of the merged scoring outputs: row of every (PlayerID, DATE)
+and the rows of every scored date.
+"""
+def build_risk_lookup(results):
+    rows = {
+        (int(player), pd.Timestamp(date)): row
+        for row, (player, date) in enumerate(zip(results['players'], results['dates']))
+    }
+
+    by_date = {}
+    for row, date in enumerate(results['dates']):
+        by_date.setdefault(pd.Timestamp(date), []).append(row)
+
+    return dict(results, rows=rows, by_date=by_date)
+
+"""
+Risk lookup of one version of the scoring outputs (see find_results),
+shared read-only by every session of the app.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_risk(results):
+    return build_risk_lookup(merge_results([read_results(path) for path, _ in results]))
+
+def load_risk(results_dirs=RESULTS_DIRS):
+    """Risk lookup of every scoring output, or None when there is none."""
+    results = find_results(results_dirs)
+    if not results:
+        return None
+
+    return load_cached_risk(results)
+
+def get_injury_index(risk, player_name, date):
+    """Risk index of a player on a date (first model of the output), or None."""
+    if risk is None:
+        return None
+
+    row = risk['rows'].get((int(player_name), pd.Timestamp(date).normalize()))
+    if row is None:
+        return None
+
+    return float(risk['indexes'][row, 0])
+
+def get_squad_risk(risk, date=None):
+    """Risk index of every player scored on a date (latest by default), highest first."""
+    if risk is None or not risk['by_date']:
+        return pd.DataFrame(columns=['PlayerID', 'Date'])
+
+    date = max(risk['by_date']) if date is None else pd.Timestamp(date).normalize()
+    rows = risk['by_date'].get(date, [])
+
+    squad_risk = pd.DataFrame(risk['indexes'][rows], columns=risk['index_columns'])
+    squad_risk.insert(0, 'PlayerID', risk['players'][rows])
+    squad_risk.insert(1, 'Date', risk['dates'][rows])
+
+    return squad_risk.sort_values(risk['index_columns'][0], ascending=False, ignore_index=True)
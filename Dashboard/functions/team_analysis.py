@@ -1,7 +1,10 @@
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
+import streamlit as st
 from datetime import timedelta
-from functions.data_processing import format_date_microcycle
+from functions.data_processing import data_version, load_cached_data
+from functions.risk_analysis import find_results, load_cached_risk
 
 # Define color scheme
 COLORS = {
@@ -12,47 +15,75 @@ COLORS = {
     'max_line': 'black'      # Black line for max values
 }
 
+# Figures kept in memory, the least recently used is evicted first
+FIGURE_CACHE_SIZE = 128
+
+# Squad heatmap metrics and their colour scales
+HEATMAP_METRICS = {
+    'Risk Index': 'RdYlGn_r',
+    'TD ACWR': 'RdYlGn_r',
+    '% Max Speed': 'Blues'
+}
+
+# Team aggregate of every metric over the players of a session
+TEAM_AGGREGATIONS = {
+    'TD': 'mean',
+    'Max Speed': 'mean',
+    'Avg Speed Season': 'mean',
+    'Sprints': 'sum',
+    'Mins': 'sum',
+    'ACC': 'max',
+    'DEC': 'min',
+    'HSR': 'mean',
+    '+25 Km/h': 'mean'
+}
+
 """
 Calculate aggregated team metrics with optional date/microcycle filter.
 """
 def calculate_team_metrics(df, selected_date=None, selected_microcycle=None):
     
-    metrics_df = df.copy()
-    
     if selected_date and selected_microcycle:
         
         # Filter for selected session metrics
-        session_metrics = metrics_df[
-            (metrics_df['DATE'].dt.date == selected_date) & 
-            (metrics_df['Microcycle'] == selected_microcycle)
+        session_metrics = df[
+            (df['DATE'].dt.date == selected_date) & 
+            (df['Microcycle'] == selected_microcycle)
         ]
         
         # Return team session metrics grouped by date and microcycle
         if not session_metrics.empty:
-            return session_metrics.groupby(['DATE', 'Microcycle']).agg({
-                'TD': 'mean',
-                'Max Speed': 'mean',
-                'Avg Speed Season': 'mean',
-                'Sprints': 'sum',
-                'Mins': 'sum',
-                'ACC': 'max',
-                'DEC': 'min',
-                'HSR': 'mean',
-                '+25 Km/h': 'mean'
-            }).reset_index()
+            return session_metrics.groupby(
+                ['DATE', 'Microcycle', 'date_label'], observed=True
+            ).agg(TEAM_AGGREGATIONS).reset_index()
     
     # Calculate metrics for all sessions
-    return metrics_df.groupby(['DATE', 'Microcycle']).agg({
-        'TD': 'mean',
-        'Max Speed': 'mean',
-        'Avg Speed Season': 'mean',
-        'Sprints': 'sum',
-        'Mins': 'sum',
-        'ACC': 'max',
-        'DEC': 'min',
-        'HSR': 'mean',
-        '+25 Km/h': 'mean'
-    }).reset_index()
+    return df.groupby(
+        ['DATE', 'Microcycle', 'date_label'], observed=True
+    ).agg(TEAM_AGGREGATIONS).reset_index()
+
+"""
+Team metrics of every session sorted by date, built once per version of
+the data file and shared read-only by every session of the app.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_team_metrics(data_path, version):
+    return calculate_team_metrics(load_cached_data(data_path, version))
+
+def load_team_metrics(data_path):
+    """Shared, read-only team aggregate table of the data file."""
+    return load_cached_team_metrics(data_path, data_version(data_path))
+
+def get_team_session(team_metrics, selected_date, selected_microcycle):
+    """Row of the team aggregate table for one session."""
+    # The table is sorted by date: binary search the selected day
+    day = pd.Timestamp(selected_date).to_datetime64()
+    dates = team_metrics['DATE'].to_numpy()
+    start = dates.searchsorted(day, side='left')
+    end = dates.searchsorted(day + np.timedelta64(1, 'D'), side='left')
+    
+    day_metrics = team_metrics.iloc[start:end]
+    return day_metrics[day_metrics['Microcycle'] == selected_microcycle]
 
 
 """
@@ -67,15 +98,11 @@ def plot_team_metrics(team_metrics, selected_date=None):
     
     # Filter data for last 7 days from selected date
     start_date = selected_date - timedelta(days=7)
-    timeline_data = team_metrics[
-        (team_metrics['DATE'] >= start_date) & 
-        (team_metrics['DATE'] <= selected_date)
-    ].sort_values('DATE')
-    
-    # Format dates for display
-    timeline_data['date_label'] = timeline_data.apply(
-        lambda x: format_date_microcycle(x['DATE'], x['Microcycle']), axis=1
-    )
+    dates = team_metrics['DATE'].to_numpy()
+    timeline_data = team_metrics.iloc[
+        dates.searchsorted(start_date.to_datetime64(), side='left'):
+        dates.searchsorted(selected_date.to_datetime64(), side='right')
+    ]
     
     # Team distance timeline
     fig_team_distance = go.Figure()
@@ -151,4 +178,96 @@ def plot_team_metrics(team_metrics, selected_date=None):
         font=dict(color=COLORS['text'])
     )
     
-    return fig_team_distance, fig_team_sprints
\ No newline at end of file
+    return fig_team_distance, fig_team_sprints
+
+"""
+Team figures of one session, built once per data version and kept in a
+bounded LRU shared by every session of the app.
+"""
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_SIZE)
+def load_cached_team_figures(data_path, version, selected_date):
+    return plot_team_metrics(load_cached_team_metrics(data_path, version), selected_date)
+
+def load_team_figures(data_path, selected_date):
+    """Memoized (distance, high intensity) figures of the team timeline."""
+    return load_cached_team_figures(data_path, data_version(data_path), selected_date)
+
+"""
+Long table of the heatmap metrics of every player and date: % Max Speed,
+TD ACWR from the rolling loads and the risk index of the scoring output.
+"""
+def calculate_squad_features(df, risk=None):
+    features = df[['PlayerID', 'DATE', '% Max Speed']].astype({'PlayerID': np.int64})
+    
+    # Acute (7-day) over chronic (21-day) daily load, NaN without chronic load
+    acute = df['TD-7'].to_numpy(dtype=float) / 7
+    chronic = df['TD-21'].to_numpy(dtype=float) / 21
+    features['TD ACWR'] = np.divide(acute, chronic, out=np.full(len(df), np.nan), where=chronic > 0)
+    
+    if risk is None:
+        features['Risk Index'] = np.nan
+        return features
+    
+    risk_index = pd.DataFrame({
+        'PlayerID': risk['players'],
+        'DATE': risk['dates'],
+        'Risk Index': risk['indexes'][:, 0]
+    })
+    return features.merge(risk_index, on=['PlayerID', 'DATE'], how='outer')
+
+"""
+Squad features of one version of the data and of the scoring output.
+"""
+@st.cache_resource(show_spinner=False, max_entries=1)
+def load_cached_squad_features(data_path, version, results):
+    risk = load_cached_risk(results) if results else None
+    return calculate_squad_features(load_cached_data(data_path, version), risk)
+
+def load_squad_features(data_path):
+    """Shared, read-only squad features of the data and the scoring outputs."""
+    return load_cached_squad_features(data_path, data_version(data_path), find_results())
+
+def build_squad_heatmap(features, end_date, days=28):
+    """Players x days grid of every heatmap metric, from one pivot of the window."""
+    end_date = pd.Timestamp(end_date)
+    start_date = end_date - timedelta(days=days - 1)
+    
+    window = features[(features['DATE'] >= start_date) & (features['DATE'] <= end_date)]
+    heatmap = window.pivot_table(
+        index='PlayerID', columns='DATE', values=list(HEATMAP_METRICS), aggfunc='mean'
+    )
+    
+    # Every metric and day of the window, with or without sessions
+    return heatmap.reindex(
+        columns=pd.MultiIndex.from_product(
+            [list(HEATMAP_METRICS), pd.date_range(start_date, end_date, freq='D')]
+        )
+    )
+
+"""
+Heatmap of one metric for the squad, a row per player and a column per day.
+"""
+def plot_squad_heatmap(heatmap, metric):
+    values = heatmap[metric]
+    
+    fig = go.Figure(go.Heatmap(
+        z=values.to_numpy(),
+        x=values.columns,
+        y=values.index.astype(str),
+        colorscale=HEATMAP_METRICS[metric],
+        hoverongaps=False,
+        colorbar=dict(title=metric)
+    ))
+    
+    fig.update_layout(
+        title=f'Squad {metric}',
+        xaxis_title='Date',
+        yaxis_title='Player',
+        yaxis=dict(type='category'),
+        height=max(400, 22 * len(values)),
+        plot_bgcolor=COLORS['background'],
+        paper_bgcolor=COLORS['background'],
+        font=dict(color=COLORS['text'])
+    )
+    
+    return fig
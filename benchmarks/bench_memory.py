@@ -0,0 +1,52 @@
+"""
+Peak memory of the scoring features for a backfill over a long history.
+
+Run from the repository root:
+    python benchmarks/bench_memory.py [--players 60] [--seasons 5] [--days 30]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_acumulado import synthetic_sessions
+from score import build_features
+
+
+def traced(func, *args):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func(*args)
+        return result, time.perf_counter() - start, tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--players", type=int, default=60)
+    parser.add_argument("--seasons", type=int, default=5)
+    parser.add_argument("--days", type=int, default=30, help="Days scored, 0 for all.")
+    args = parser.parse_args()
+
+    df = synthetic_sessions(args.players, args.seasons)
+    date_to = df["Date"].max()
+    date_from = df["Date"].min()
+    if args.days:
+        date_from = date_to - pd.Timedelta(days=args.days - 1)
+
+    input_mb = df.memory_usage(deep=True).sum() / 1e6
+    print(f"{len(df)} sessions, {args.players} players, {args.seasons} seasons")
+    print(f"input frame     : {input_mb:8.1f} MB")
+
+    features, elapsed, peak = traced(build_features, df, date_from, date_to)
+
+    print(f"scored rows     : {len(features):8d}")
+    print(f"peak memory     : {peak / 1e6:8.1f} MB")
+    print(f"time            : {elapsed:8.3f} s")
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+# Rows sent to predict_proba at once when scoring a date range
+BATCH_SIZE = 50_000
+
+
+def add_backfill_args(parser):
+    parser.add_argument(
+        "--from",
+        dest="date_from",
+        type=pd.Timestamp,
+        help="First date to score (YYYY-MM-DD). Enables backfill mode.",
+    )
+    parser.add_argument(
+        "--to",
+        dest="date_to",
+        type=pd.Timestamp,
+        help="Last date to score (YYYY-MM-DD). Enables backfill mode.",
+    )
+    return parser
+
+
+def scoring_date_mask(df, date_from=None, date_to=None):
+    """Rows to score: the latest date, or every date in [date_from, date_to]."""
+    if date_from is None and date_to is None:
+        return df["Date"] == df["Date"].max()
+
+    mask = pd.Series(True, index=df.index)
+    if date_from is not None:
+        mask &= df["Date"] >= date_from
+    if date_to is not None:
+        mask &= df["Date"] <= date_to
+    return mask
+
+
+def predict_in_batches(model, X, batch_size=BATCH_SIZE):
+    """Positive-class probability (0-100) for every row of X."""
+    if len(X) == 0:
+        return np.empty(0)
+
+    predictions = [
+        model.predict_proba(X.iloc[start : start + batch_size])[:, 1]
+        for start in range(0, len(X), batch_size)
+    ]
+    return np.concatenate(predictions) * 100
+
+
+def backfill_filename(date_from, date_to, dates):
+    first = (date_from if date_from is not None else dates.min()).strftime("%d-%m-%Y")
+    last = (date_to if date_to is not None else dates.max()).strftime("%d-%m-%Y")
+    return f"results_backfill_{first}_{last}.xlsx"
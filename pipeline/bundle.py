@@ -0,0 +1,189 @@
+"""
+Versioned model bundles: native model file, feature manifest, scaler and
+risk thresholds in one directory.
+
+Export the registered pickles once with:
+    python -m pipeline.bundle xgb1 xgb2
+"""
+import json
+import os
+import sys
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from pipeline.backfill import BATCH_SIZE
+from pipeline.columns import metrics_test, session_columns
+from pipeline.export import RISK_THRESHOLDS
+
+BUNDLE_VERSION = 1
+
+MANIFEST = "manifest.json"
+
+
+class ModelBundle:
+    """
+    A model bundle on disk, loaded lazily.
+
+    Only the manifest is read when the bundle is opened. The model and
+    scaler are loaded on the first prediction, and the position of every
+    manifest feature in the scored frame is resolved (and checked) once per
+    column layout, so rows are selected by array index.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest = json.load(f)
+
+        if self.manifest["version"] != BUNDLE_VERSION:
+            raise ValueError(
+                f"Bundle {path} has version {self.manifest['version']}, "
+                f"expected {BUNDLE_VERSION}."
+            )
+
+        self.name = self.manifest["name"]
+        self.kind = self.manifest["kind"]
+        self.features = self.manifest["features"]
+        self.thresholds = self.manifest["thresholds"]
+
+        self._model = None
+        self._scaler = None
+        self._positions = {}
+
+    @property
+    def model(self):
+        if self._model is None:
+            model_path = os.path.join(self.path, self.manifest["model"])
+
+            if self.kind == "xgb":
+                import xgboost as xgb
+
+                booster = xgb.Booster()
+                booster.load_model(model_path)
+
+                if booster.feature_names and booster.feature_names != self.features:
+                    raise ValueError(
+                        f"Booster features of {self.path} do not match its manifest."
+                    )
+                self._model = booster
+            else:
+                self._model = joblib.load(model_path)
+
+        return self._model
+
+    @property
+    def scaler(self):
+        """(feature positions, mean, scale) arrays, or None when unscaled."""
+        if self._scaler is None and self.manifest.get("scaler"):
+            with open(os.path.join(self.path, self.manifest["scaler"])) as f:
+                scaler = json.load(f)
+
+            self._scaler = (
+                np.array([self.features.index(col) for col in scaler["columns"]]),
+                np.array(scaler["mean"]),
+                np.array(scaler["scale"]),
+            )
+
+        return self._scaler
+
+    def feature_positions(self, columns):
+        """Positions of the manifest features in `columns`, checked once."""
+        key = tuple(columns)
+
+        if key not in self._positions:
+            index = {col: position for position, col in enumerate(columns)}
+            missing = [col for col in self.features if col not in index]
+            if missing:
+                raise ValueError(f"Missing features for {self.name}: {missing}")
+
+            self._positions[key] = np.array([index[col] for col in self.features])
+
+        return self._positions[key]
+
+    def predict(self, df, batch_size=BATCH_SIZE):
+        """Injury risk index (0-100) for every row of df."""
+        positions = self.feature_positions(df.columns)
+        X = df.iloc[:, positions].to_numpy(dtype=float)
+
+        if self.scaler is not None:
+            scaled, mean, scale = self.scaler
+            X[:, scaled] = (X[:, scaled] - mean) / scale
+
+        if len(X) == 0:
+            return np.empty(0)
+
+        predictions = []
+        for start in range(0, len(X), batch_size):
+            batch = X[start : start + batch_size]
+            if self.kind == "xgb":
+                predictions.append(self.model.inplace_predict(batch))
+            else:
+                predictions.append(np.asarray(self.model.predict(batch)).ravel())
+
+        return np.concatenate(predictions) * 100
+
+
+def export_bundle(name, spec, thresholds=RISK_THRESHOLDS):
+    """Write the bundle of a registered pickle model to spec["bundle"]."""
+    out_dir = spec["bundle"]
+    os.makedirs(out_dir, exist_ok=True)
+
+    model = joblib.load(spec["path"])
+    manifest = {
+        "version": BUNDLE_VERSION,
+        "name": name,
+        "kind": spec["kind"],
+        "source": spec["path"],
+        "created": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "features": metrics_test,
+        "thresholds": dict(thresholds),
+        "scaler": None,
+    }
+
+    if spec["kind"] == "xgb":
+        booster = model.get_booster()
+        if booster.feature_names:
+            manifest["features"] = list(booster.feature_names)
+
+        # Native compact format, loads without unpickling the sklearn wrapper
+        booster.save_model(os.path.join(out_dir, "model.ubj"))
+        manifest["model"] = "model.ubj"
+    else:
+        joblib.dump(model, os.path.join(out_dir, "model.pkl"))
+        manifest["model"] = "model.pkl"
+
+    if "scaler" in spec:
+        scaler = joblib.load(spec["scaler"])
+        if hasattr(scaler, "feature_names_in_"):
+            columns = list(scaler.feature_names_in_)
+        else:
+            columns = [col for col in manifest["features"] if col not in session_columns]
+
+        with open(os.path.join(out_dir, "scaler.json"), "w") as f:
+            json.dump(
+                {
+                    "columns": columns,
+                    "mean": scaler.mean_.tolist(),
+                    "scale": scaler.scale_.tolist(),
+                },
+                f,
+            )
+        manifest["scaler"] = "scaler.json"
+
+    with open(os.path.join(out_dir, MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    return out_dir
+
+
+if __name__ == "__main__":
+    from pipeline.models import MODELS
+
+    for name in sys.argv[1:] or list(MODELS):
+        if not os.path.exists(MODELS[name]["path"]):
+            print(f"Skipping {name}: {MODELS[name]['path']} not found.")
+            continue
+        print(f"Bundle written to {export_bundle(name, MODELS[name])}")
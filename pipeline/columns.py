@@ -0,0 +1,188 @@
+selected_cols = [
+    "Column1",
+    "injury",
+    "MD",
+    "Session Date",
+    "Total Time",
+    "Total Distance",
+    "Distance Zone 5 (Absolute)",
+    "Distance Zone 6 (Absolute)",
+    "Distance Zone 5 (Relative)",
+    "Distance Zone 6 (Relative)",
+    "Sprints",
+    "% Max Speed",
+    "ACC B1-3",
+    "DEC B1-3",
+]
+
+rename_map = {
+    "Column1": "PlayerID",
+    "injury": "Injury",
+    "MD": "Session",
+    "Session Date": "Date",
+    "Total Time": "Mins",
+    "Total Distance": "TD",
+    "Distance Zone 5 (Absolute)": ">19.8",
+    "Distance Zone 6 (Absolute)": ">25",
+    "Distance Zone 5 (Relative)": ">19.8_Rel-1",
+    "Distance Zone 6 (Relative)": ">25_Rel-1",
+    "Sprints": "Sprints",
+    "% Max Speed": "% Max Speed",
+    "ACC B1-3": "ACC",
+    "DEC B1-3": "DEC",
+}
+
+cols_float = [
+    "Total Time",
+    "Total Distance",
+    "Distance Zone 5 (Absolute)",
+    "Distance Zone 6 (Absolute)",
+    "Distance Zone 5 (Relative)",
+    "Distance Zone 6 (Relative)",
+    "Sprints",
+    "% Max Speed",
+    "ACC B1-3",
+    "DEC B1-3",
+]
+
+cols_calculate_loads = ["TD", ">19.8", ">25", "ACC", "DEC", "Sprints", "% Max Speed"]
+
+cols_calculate_fatigues = ["TD", ">19.8", ">25", "ACC", "DEC"]
+
+columns_to_drop = [
+    "TD-7-avg",
+    "TD-7-std",
+    ">19.8-7-avg",
+    ">19.8-7-std",
+    ">25-7-avg",
+    ">25-7-std",
+    "ACC-7-avg",
+    "ACC-7-std",
+    "DEC-7-avg",
+    "DEC-7-std",
+    "Sprints-7-avg",
+    "Sprints-7-std",
+    "TD-21-avg",
+    "TD-21-std",
+    ">19.8-21-avg",
+    ">19.8-21-std",
+    ">25-21-avg",
+    ">25-21-std",
+    "ACC-21-avg",
+    "ACC-21-std",
+    "DEC-21-avg",
+    "DEC-21-std",
+    "Sprints-21-avg",
+    "Sprints-21-std",
+]
+
+# Session types scored by the models, in the order of their one-hot columns
+session_types = [
+    "MD",
+    "MD+1",
+    "MD+2",
+    "MD+3",
+    "MD-1",
+    "MD-2",
+    "MD-3",
+    "MD-4",
+    "MD-5",
+]
+
+session_columns = [f"Session_{session}" for session in session_types]
+
+# Known session codes that are not matchday offsets (never scored)
+other_session_codes = ["MDT", "REHAB", "NON SQUAD"]
+
+metrics_test = [
+    "TD-1",
+    ">19.8-1",
+    ">25-1",
+    "ACC-1",
+    "DEC-1",
+    "Sprints-1",
+    "Mins-1",
+    ">19.8_Rel-1",
+    ">25_Rel-1",
+    "% Max Speed-1",
+    "TD-3",
+    ">19.8-3",
+    ">25-3",
+    "ACC-3",
+    "DEC-3",
+    "Sprints-3",
+    "TD-7",
+    ">19.8-7",
+    ">25-7",
+    "ACC-7",
+    "DEC-7",
+    "Sprints-7",
+    "TD-21",
+    ">19.8-21",
+    ">25-21",
+    "ACC-21",
+    "DEC-21",
+    "Sprints-21",
+    "TD_ACWR",
+    "TD_MSWR",
+    ">19.8_ACWR",
+    ">19.8_MSWR",
+    ">25_ACWR",
+    ">25_MSWR",
+    "ACC_ACWR",
+    "ACC_MSWR",
+    "DEC_ACWR",
+    "DEC_MSWR",
+    "Session_MD",
+    "Session_MD+1",
+    "Session_MD+2",
+    "Session_MD+3",
+    "Session_MD-1",
+    "Session_MD-2",
+    "Session_MD-3",
+    "Session_MD-4",
+    "Session_MD-5",
+]
+
+metrics_results = [
+    "PlayerID",
+    "Index",
+    "TD-1",
+    ">19.8-1",
+    ">25-1",
+    "ACC-1",
+    "DEC-1",
+    "Sprints-1",
+    "Mins-1",
+    ">19.8_Rel-1",
+    ">25_Rel-1",
+    "% Max Speed-1",
+    "TD-3",
+    ">19.8-3",
+    ">25-3",
+    "ACC-3",
+    "DEC-3",
+    "Sprints-3",
+    "TD-7",
+    ">19.8-7",
+    ">25-7",
+    "ACC-7",
+    "DEC-7",
+    "Sprints-7",
+    "TD-21",
+    ">19.8-21",
+    ">25-21",
+    "ACC-21",
+    "DEC-21",
+    "Sprints-21",
+    "TD_ACWR",
+    "TD_MSWR",
+    ">19.8_ACWR",
+    ">19.8_MSWR",
+    ">25_ACWR",
+    ">25_MSWR",
+    "ACC_ACWR",
+    "ACC_MSWR",
+    "DEC_ACWR",
+    "DEC_MSWR",
+]
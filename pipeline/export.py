@@ -0,0 +1,120 @@
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import PatternFill
+from openpyxl.utils import get_column_letter
+
+# Index above "high" is red, from "medium" to "high" yellow, below green
+RISK_THRESHOLDS = {"high": 50, "medium": 35}
+
+# Shared by every rule, one style entry per colour in the workbook
+RED_FILL = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
+YELLOW_FILL = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+GREEN_FILL = PatternFill(start_color="00FF00", end_color="00FF00", fill_type="solid")
+
+# Exports with more rows than this are streamed with a write-only workbook
+STREAMING_MIN_ROWS = 10_000
+
+# Significant digits a float32 holds, float32 columns are written with these
+FLOAT32_DIGITS = 7
+
+
+def add_risk_formatting(worksheet, df, thresholds):
+    """Colour every "Index" column with three sheet-level conditional rules."""
+    if df.empty:
+        return
+
+    for position, col in enumerate(df.columns, start=1):
+        if "Index" not in col:
+            continue
+
+        high = thresholds.get(col, RISK_THRESHOLDS)["high"]
+        medium = thresholds.get(col, RISK_THRESHOLDS)["medium"]
+
+        letter = get_column_letter(position)
+        cells = f"{letter}2:{letter}{len(df) + 1}"  # row 1 is the header
+
+        worksheet.conditional_formatting.add(
+            cells,
+            CellIsRule(operator="greaterThan", formula=[str(high)], fill=RED_FILL),
+        )
+        worksheet.conditional_formatting.add(
+            cells,
+            CellIsRule(
+                operator="between", formula=[str(medium), str(high)], fill=YELLOW_FILL
+            ),
+        )
+        worksheet.conditional_formatting.add(
+            cells,
+            CellIsRule(operator="lessThan", formula=[str(medium)], fill=GREEN_FILL),
+        )
+
+
+def widen_float32(df):
+    """float32 columns as float64 rounded to FLOAT32_DIGITS, 9682.92 not 9682.9199."""
+    float32_columns = df.columns[df.dtypes == np.float32]
+    if float32_columns.empty:
+        return df
+
+    values = df[float32_columns].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        magnitude = np.floor(np.log10(np.abs(values)))
+        scale = 10.0 ** (FLOAT32_DIGITS - 1 - magnitude)
+        rounded = np.round(values * scale) / scale
+    rounded = np.where(np.isfinite(rounded), rounded, values)
+
+    return df.assign(**dict(zip(float32_columns, rounded.T)))
+
+
+def stream_excel(df, file_path, thresholds):
+    """Write df row by row with a write-only workbook, never holding the sheet."""
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Sheet1")
+
+    add_risk_formatting(worksheet, df, thresholds)
+
+    worksheet.append(list(df.columns))
+    for start in range(0, len(df), STREAMING_MIN_ROWS):
+        chunk = df.iloc[start : start + STREAMING_MIN_ROWS]
+        # Empty cells for NaN, as to_excel writes them
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            worksheet.append(row)
+
+    workbook.save(file_path)
+
+
+def export_excel(df, filename=None, thresholds=None, streaming=None):
+    # Risk bands per "Index" column, defaults to RISK_THRESHOLDS
+    thresholds = thresholds or {}
+
+    # Features from the load tensor are float32, written at their own precision
+    df = widen_float32(df)
+
+    if streaming is None:
+        streaming = len(df) > STREAMING_MIN_ROWS
+
+    if filename is None:
+        # Get current date
+        current_date = datetime.now().strftime("%d-%m-%Y")
+        # Create file name with current date
+        filename = f"results_{current_date}.xlsx"
+    # Get the current working directory and form full path
+    current_directory = os.getcwd()
+
+    file_path = os.path.join(current_directory, filename)
+
+    if streaming:
+        stream_excel(df, file_path, thresholds)
+        return file_path
+
+    # Create a Pandas Excel writer using Openpyxl as the engine
+    with pd.ExcelWriter(file_path, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Sheet1")
+        add_risk_formatting(writer.sheets["Sheet1"], df, thresholds)
+
+    return file_path
@@ -0,0 +1,260 @@
+import json
+import os
+import shutil
+import sqlite3
+from contextlib import closing, contextmanager
+
+import numpy as np
+import pandas as pd
+
+from pipeline.rolling import calcular_acumulado, tensor_columns
+from pipeline.tensor import LOAD_DTYPE
+from pipeline.workload import EWMA_SPANS, add_ewma_features, ewma_columns, ewma_loads
+
+FEATURE_STORE_PATH = "feature_store.sqlite"
+
+# Longest rolling window, every buffered day older than this is dropped
+BUFFER_DAYS = 21
+
+
+def day_hashes(df):
+    """Order-independent content hash of every Date in a processed frame."""
+    row_hashes = pd.util.hash_pandas_object(
+        df.drop(columns="Date"), index=False
+    ).to_numpy()
+
+    # Wrapping uint64 sum, so the row order inside a day does not matter
+    sums = {}
+    for date, positions in df.groupby("Date").indices.items():
+        sums[pd.Timestamp(date)] = format(
+            int(row_hashes[positions].sum(dtype=np.uint64)), "016x"
+        )
+
+    return pd.DataFrame({"Date": list(sums.keys()), "hash": list(sums.values())})
+
+
+def read_table(conn, table):
+    df = pd.read_sql_query(f'SELECT * FROM "{table}"', conn)
+    if "Date" in df.columns:
+        df["Date"] = pd.to_datetime(df["Date"])
+    return df
+
+
+def read_meta(conn):
+    try:
+        rows = conn.execute("SELECT key, value FROM meta").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {key: json.loads(value) for key, value in rows}
+
+
+def write_meta(conn, meta):
+    conn.execute("DROP TABLE IF EXISTS meta")
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany(
+        "INSERT INTO meta VALUES (?, ?)",
+        [(key, json.dumps(value)) for key, value in meta.items()],
+    )
+
+
+@contextmanager
+def staged_store(path, fresh=False):
+    """
+    Connection to a copy of the store that replaces it only when the block
+    completes.
+
+    to_sql commits every table on its own, so the tables of a run are
+    written into the copy and swapped in with one os.replace: a run that
+    dies halfway leaves the previous store as it was. With `fresh` the copy
+    starts empty.
+    """
+    staging = path + ".tmp"
+    if os.path.exists(staging):
+        os.remove(staging)
+    if not fresh and os.path.exists(path):
+        shutil.copyfile(path, staging)
+
+    try:
+        with closing(sqlite3.connect(staging)) as conn, conn:
+            yield conn
+        os.replace(staging, path)
+    finally:
+        if os.path.exists(staging):
+            os.remove(staging)
+
+
+def stored_after(conn, last_date):
+    """True when features or day_hashes hold days after the stored last_date."""
+    for table in ["features", "day_hashes"]:
+        try:
+            (latest,) = conn.execute(f'SELECT MAX("Date") FROM "{table}"').fetchone()
+        except sqlite3.OperationalError:
+            # Table missing, the store is incomplete
+            return True
+        if latest is not None and pd.Timestamp(latest) > last_date:
+            return True
+    return False
+
+
+def history_unchanged(conn, processed_df, last_date):
+    """True when every already-stored day of the export hashes the same."""
+    past = processed_df[processed_df["Date"] <= last_date]
+    if past.empty:
+        # Export only holds new days
+        return True
+
+    stored = read_table(conn, "day_hashes").set_index("Date")["hash"]
+    current = day_hashes(past).set_index("Date")["hash"]
+
+    known = current.index.isin(stored.index)
+    if not known.all():
+        # A day was added before the last processed date
+        return False
+
+    return bool((stored.loc[current.index] == current).all())
+
+
+def trailing_buffer(df, last_date):
+    return df[df["Date"] > last_date - pd.Timedelta(days=BUFFER_DAYS)]
+
+
+def rebuild_feature_store(
+    conn, processed_df, columnas_calcular, dias, signature, ewma_metrics=None
+):
+    cumulative_df = calcular_acumulado(processed_df, columnas_calcular, dias)
+    last_date = processed_df["Date"].max()
+
+    if ewma_metrics:
+        ewma_features, ewma_state = ewma_loads(processed_df, ewma_metrics)
+        cumulative_df = add_ewma_features(cumulative_df, ewma_features)
+        ewma_state.to_sql("ewma_state", conn, if_exists="replace", index=False)
+
+    first_dates = processed_df.groupby("PlayerID", as_index=False)["Date"].min()
+
+    trailing_buffer(processed_df, last_date).to_sql(
+        "daily_loads", conn, if_exists="replace", index=False
+    )
+    first_dates.to_sql("players", conn, if_exists="replace", index=False)
+    day_hashes(processed_df).to_sql("day_hashes", conn, if_exists="replace", index=False)
+    cumulative_df.to_sql("features", conn, if_exists="replace", index=False)
+
+    write_meta(conn, {"signature": signature, "last_date": str(last_date.date())})
+
+    return cumulative_df
+
+
+def append_feature_store(
+    conn, new_rows, columnas_calcular, dias, meta, ewma_metrics=None
+):
+    buffer = read_table(conn, "daily_loads")
+    first_dates = read_table(conn, "players")
+
+    # Players seen for the first time start their calendar today
+    new_players = new_rows.groupby("PlayerID", as_index=False)["Date"].min()
+    new_players = new_players[~new_players["PlayerID"].isin(first_dates["PlayerID"])]
+    first_dates = pd.concat([first_dates, new_players], ignore_index=True)
+
+    # Only the trailing windows are recomputed, O(players x BUFFER_DAYS)
+    combined = pd.concat([buffer, new_rows[buffer.columns]], ignore_index=True)
+    cumulative_df = calcular_acumulado(
+        combined,
+        columnas_calcular,
+        dias,
+        calendar_start=first_dates.set_index("PlayerID")["Date"],
+    )
+    last_date = pd.Timestamp(meta["last_date"])
+    cumulative_df = cumulative_df[cumulative_df["Date"] > last_date].reset_index(
+        drop=True
+    )
+
+    if ewma_metrics:
+        # Recursive from each player's stored level, no history needed
+        ewma_features, ewma_state = ewma_loads(
+            new_rows, ewma_metrics, read_table(conn, "ewma_state")
+        )
+        cumulative_df = add_ewma_features(cumulative_df, ewma_features)
+        ewma_state.to_sql("ewma_state", conn, if_exists="replace", index=False)
+
+    last_date = new_rows["Date"].max()
+    trailing_buffer(combined, last_date).to_sql(
+        "daily_loads", conn, if_exists="replace", index=False
+    )
+    first_dates.to_sql("players", conn, if_exists="replace", index=False)
+    day_hashes(new_rows).to_sql("day_hashes", conn, if_exists="append", index=False)
+    cumulative_df.to_sql("features", conn, if_exists="append", index=False)
+
+    write_meta(conn, {**meta, "last_date": str(last_date.date())})
+
+    return cumulative_df
+
+
+def update_feature_store(
+    processed_df,
+    columnas_calcular,
+    dias,
+    path=FEATURE_STORE_PATH,
+    rebuild=False,
+    ewma_metrics=None,
+):
+    """
+    Return the rolling load features for the days not yet in the store.
+
+    The store keeps each player's trailing 21-day buffer so a new day's
+    export only costs a few rows of work per player. Any change to an
+    already-stored day (or to the feature configuration) triggers a full
+    rebuild from `processed_df`, which then returns the whole history. The
+    tables of a run replace the previous store in one step (staged_store),
+    and a store holding days past its recorded last date is rebuilt.
+
+    With `ewma_metrics`, the EWMA loads of those metrics (see
+    pipeline.workload.ewma_loads) are added next to the rolling features;
+    the store keeps only their last level per player.
+    """
+    signature = {
+        "columns": processed_df.columns.tolist(),
+        "loads": list(columnas_calcular),
+        "days": list(dias),
+        "ewma": {"metrics": list(ewma_metrics or []), "spans": EWMA_SPANS},
+    }
+
+    with closing(sqlite3.connect(path)) as conn:
+        meta = read_meta(conn)
+        rebuild = rebuild or meta.get("signature") != signature
+
+        if not rebuild:
+            last_date = pd.Timestamp(meta["last_date"])
+            if stored_after(conn, last_date):
+                print("Feature store left incomplete by a previous run. Rebuilding.")
+                rebuild = True
+            elif not history_unchanged(conn, processed_df, last_date):
+                print("Past sessions changed since the last run. Rebuilding features.")
+                rebuild = True
+
+        if not rebuild:
+            new_rows = processed_df[processed_df["Date"] > last_date]
+            if new_rows.empty:
+                # Nothing new, serve the already computed latest day
+                features = read_table(conn, "features")
+                features = features[features["Date"] == last_date].reset_index(
+                    drop=True
+                )
+
+                # Stored as REAL, served in the float32 they were computed in
+                float32_columns = [
+                    col
+                    for col in tensor_columns(columnas_calcular, dias)
+                    + ewma_columns(ewma_metrics or [])
+                    if col in features.columns
+                ]
+                return features.astype({col: LOAD_DTYPE for col in float32_columns})
+
+    # Every table of the run is written at once, or not at all
+    with staged_store(path, fresh=rebuild) as conn:
+        if rebuild:
+            return rebuild_feature_store(
+                conn, processed_df, columnas_calcular, dias, signature, ewma_metrics
+            )
+
+        return append_feature_store(
+            conn, new_rows, columnas_calcular, dias, meta, ewma_metrics
+        )
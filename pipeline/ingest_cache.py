@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+INGEST_CACHE_DIR = ".ingest_cache"
+
+
+def file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def cache_base(path, cache_dir):
+    key = hashlib.sha256(os.path.abspath(path).encode()).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(cache_dir, f"{name}-{key}")
+
+
+def read_cached_copy(base, meta):
+    if meta["format"] == "parquet":
+        return pd.read_parquet(f"{base}.parquet")
+    return pd.read_pickle(f"{base}.pkl")
+
+
+def write_cached_copy(base, df):
+    try:
+        df.to_parquet(f"{base}.parquet", index=False)
+        return "parquet"
+    except Exception:
+        # Mixed-type object columns (ints and strings) cannot go to Parquet
+        df.to_pickle(f"{base}.pkl")
+        return "pickle"
+
+
+def read_excel_cached(path, usecols=None, dtype=None, cache_dir=INGEST_CACHE_DIR):
+    """
+    Read an Excel workbook through a Parquet copy of it.
+
+    The first read parses the workbook and stores the selected columns as
+    Parquet (or a pickle when a column mixes types Parquet cannot hold).
+    Later reads return that copy while the workbook's size and mtime are
+    unchanged. If only the mtime moved, the content hash decides whether
+    the copy is still valid. Without pyarrow installed the workbook is read
+    directly every time.
+    """
+    if not parquet_available():
+        return pd.read_excel(path, usecols=usecols, dtype=dtype)
+
+    base = cache_base(path, cache_dir)
+    meta_path = f"{base}.json"
+    stat = os.stat(path)
+    request = {
+        "usecols": list(usecols) if usecols is not None else None,
+        "dtype": {
+            col: pd.api.types.pandas_dtype(kind).name
+            for col, kind in (dtype or {}).items()
+        },
+    }
+
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+    if meta is not None and meta["request"] == request and meta["size"] == stat.st_size:
+        if meta["mtime"] == stat.st_mtime:
+            return read_cached_copy(base, meta)
+
+        # Touched but maybe not edited, compare the content
+        content_hash = file_digest(path)
+        if meta["sha256"] == content_hash:
+            meta["mtime"] = stat.st_mtime
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+            return read_cached_copy(base, meta)
+    else:
+        content_hash = file_digest(path)
+
+    df = pd.read_excel(path, usecols=usecols, dtype=dtype)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_format = write_cached_copy(base, df)
+    with open(meta_path, "w") as f:
+        json.dump(
+            {
+                "path": os.path.abspath(path),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "sha256": content_hash,
+                "request": request,
+                "format": cache_format,
+            },
+            f,
+        )
+
+    return df
@@ -0,0 +1,108 @@
+import os
+from functools import lru_cache
+
+import joblib
+import numpy as np
+
+from pipeline.backfill import predict_in_batches
+from pipeline.bundle import MANIFEST, ModelBundle
+from pipeline.columns import metrics_test, session_columns
+from pipeline.export import RISK_THRESHOLDS
+
+# Registered scoring models, scored in this order
+# A model is read from its bundle when exported (python -m pipeline.bundle),
+# otherwise from the legacy pickle files
+MODELS = {
+    "ann": {
+        "path": "ann_model_ns.pkl",
+        "kind": "ann",
+        "scaler": "ann_scaler_ns.pkl",
+        "bundle": "models/ann",
+    },
+    "xgb1": {"path": "xgb_model_ns_1.pkl", "kind": "xgb", "bundle": "models/xgb1"},
+    "xgb2": {"path": "xgb_model_ns_2.pkl", "kind": "xgb", "bundle": "models/xgb2"},
+}
+
+
+def model_files(spec):
+    return [spec["path"]] + ([spec["scaler"]] if "scaler" in spec else [])
+
+
+def has_bundle(spec):
+    return os.path.exists(os.path.join(spec["bundle"], MANIFEST))
+
+
+@lru_cache(maxsize=None)
+def load_bundle(path):
+    return ModelBundle(path)
+
+
+def available_models():
+    """Registered models with a bundle or all legacy files in the current directory."""
+    return [
+        name
+        for name, spec in MODELS.items()
+        if has_bundle(spec) or all(os.path.exists(path) for path in model_files(spec))
+    ]
+
+
+def risk_thresholds(name):
+    spec = MODELS[name]
+    if has_bundle(spec):
+        return load_bundle(spec["bundle"]).thresholds
+    return RISK_THRESHOLDS
+
+
+@lru_cache(maxsize=None)
+def load_scaler(path):
+    """
+    Training-time StandardScaler as (column positions, mean, scale) arrays.
+
+    Positions index into metrics_test, so scaling is one affine transform
+    over the feature array. Loaded once per process.
+    """
+    scaler = joblib.load(path)
+
+    if hasattr(scaler, "feature_names_in_"):
+        scaled_columns = list(scaler.feature_names_in_)
+    else:
+        # Fitted on a bare array: every non-session column, in training order
+        scaled_columns = [col for col in metrics_test if col not in session_columns]
+
+    positions = np.array([metrics_test.index(col) for col in scaled_columns])
+    mean = scaler.mean_ if scaler.with_mean else np.zeros(len(positions))
+    scale = scaler.scale_ if scaler.with_std else np.ones(len(positions))
+
+    return positions, mean, scale
+
+
+def standarize_data_ann(df, scaler_path):
+    """Scale the metrics_test features with the scaler saved at training time."""
+    positions, mean, scale = load_scaler(scaler_path)
+
+    scaled_data = df[metrics_test].to_numpy(dtype=float)
+    scaled_data[:, positions] = (scaled_data[:, positions] - mean) / scale
+
+    return scaled_data
+
+
+def predict_risk(name, test_df):
+    """Injury risk index (0-100) of every row of test_df for one registered model."""
+    spec = MODELS[name]
+    if has_bundle(spec):
+        return load_bundle(spec["bundle"]).predict(test_df)
+
+    model = joblib.load(spec["path"])
+
+    if spec["kind"] == "ann":
+        if not os.path.exists(spec["scaler"]):
+            raise FileNotFoundError(
+                f"{spec['scaler']} not found. Save the scaler fitted in training next "
+                f"to {spec['path']} (see ML_Model.ipynb)."
+            )
+
+        # Scale with the training-time statistics, never refit on the batch
+        X_test_scaled = standarize_data_ann(test_df, spec["scaler"])
+        return np.asarray(model.predict(X_test_scaled)).ravel() * 100
+
+    return predict_in_batches(model, test_df[metrics_test])
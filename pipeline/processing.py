@@ -0,0 +1,305 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from pipeline.backfill import scoring_date_mask
+from pipeline.columns import (
+    cols_calculate_loads,
+    cols_float,
+    columns_to_drop,
+    other_session_codes,
+    rename_map,
+    selected_cols,
+    session_columns,
+    session_types,
+)
+from pipeline.ingest_cache import read_excel_cached
+from pipeline.tensor import ONE_DAY, build_load_tensor
+from pipeline.workload import workload_ratios
+
+
+def read_files():
+    try:
+        # Get the current directory
+        current_dir = os.getcwd()
+
+        # List all files in the current directory
+        files = [f for f in os.listdir(current_dir) if os.path.isfile(f)]
+
+        # Ensure there are at least two files in the folder
+        if len(files) < 1:
+            raise FileNotFoundError(
+                "Not enough files in the folder! Ensure the file is present."
+            )
+
+        # Read Excel file (served from the columnar cache when unchanged)
+        df = read_excel_cached(
+            "data.xlsx",
+            usecols=selected_cols,
+            dtype={col: float for col in cols_float},
+        )
+
+        return df
+
+    except FileNotFoundError as fnf_error:
+        print(f"File not found: {fnf_error}")
+        return None
+
+    except Exception as e:
+        print(f"An error occurred while reading the files: {e}")
+        return None
+
+
+def process_duplicates(df):
+    """
+    Merge the sessions a player has split over several rows on the same date.
+
+    Loads are summed, % Max Speed takes the maximum and a merged session is
+    "MD" when any of its parts is, otherwise its first part's session. The
+    relative distances of split sessions are not combined and are left
+    empty. Single sessions come first in their original order, followed by
+    the merged ones sorted by player and date.
+    """
+    keys = ["PlayerID", "Date"]
+
+    # Define columns to sum
+    columns_to_sum = ["Injury", "Mins", "TD", ">19.8", ">25", "Sprints", "ACC", "DEC"]
+
+    # Define columns to select the maximum value
+    columns_to_max = ["% Max Speed"]
+
+    # Columns left empty on merged sessions
+    columns_to_clear = [
+        col
+        for col in df.columns
+        if col not in keys + columns_to_sum + columns_to_max + ["Session"]
+    ]
+
+    split = df.duplicated(subset=keys, keep=False).to_numpy()
+    # Split rows without a player or date can't be merged and are dropped
+    mergeable = split & df[keys].notna().all(axis=1).to_numpy()
+
+    # Single sessions in place, then the split ones sorted by player and date
+    ordered = pd.concat(
+        [df[~split], df[mergeable].sort_values(keys, kind="stable")], ignore_index=True
+    )
+    ordered["is_md"] = ordered["Session"].eq("MD")
+
+    # One row per (PlayerID, Date) in the frame order
+    grouped = ordered.groupby(keys, sort=False, dropna=False)
+    final_df = grouped.agg(
+        **{col: (col, "first") for col in columns_to_clear},
+        **{col: (col, "sum") for col in columns_to_sum},
+        **{col: (col, "max") for col in columns_to_max},
+        Session=("Session", "first"),
+        is_md=("is_md", "any"),
+        parts=("Session", "size"),
+    ).reset_index()
+
+    merged = final_df["parts"] > 1
+    final_df.loc[final_df["is_md"], "Session"] = "MD"
+    final_df.loc[merged, columns_to_clear] = np.nan
+
+    # A single session keeps its empty loads, a merged one sums what it has
+    single_missing = (
+        ~merged.to_numpy()[:, None] & grouped[columns_to_sum].count().eq(0).to_numpy()
+    )
+    final_df[columns_to_sum] = final_df[columns_to_sum].mask(single_missing)
+
+    return final_df[df.columns]
+
+
+def clean_session_value(session):
+    # Check for the pattern +X/-X and extract the -X part
+    match = re.search(r"(-\d+)", session)
+    if match:
+        return f"MD{match.group(1)}"  # Return MD concatenated with the negative value
+    return session  # Return the original value if no -X is found
+
+
+# Normalized matchday code: MD or MD followed by a signed day offset
+SESSION_CODE = re.compile(r"MD([+-]\d+)?")
+
+
+def normalize_sessions(sessions):
+    """
+    clean_session_value over a column, run once per distinct raw code.
+
+    Raw codes are factorized, each unique code is cleaned once into a
+    dictionary and the cleaned values are broadcast back through the codes.
+    Codes that are neither matchday offsets nor other_session_codes are
+    reported in one summary.
+    """
+    codes, uniques = pd.factorize(sessions)
+
+    cleaned = {raw: clean_session_value(raw) for raw in uniques}
+    values = np.array([cleaned[raw] for raw in uniques] + [np.nan], dtype=object)
+
+    unknown = [
+        position
+        for position, raw in enumerate(uniques)
+        if not SESSION_CODE.fullmatch(cleaned[raw])
+        and cleaned[raw] not in other_session_codes
+    ]
+    if unknown:
+        counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        summary = ", ".join(f"{uniques[i]} ({counts[i]})" for i in unknown)
+        print(f"Unknown session codes: {summary}")
+
+    # Code -1 (missing session) picks the trailing NaN
+    return pd.Series(values[codes], index=sessions.index, name=sessions.name)
+
+
+def data_processing(df):
+    df = df[selected_cols]
+
+    df.loc[:, cols_float] = df.loc[:, cols_float].astype(float)
+    df = df.rename(columns=rename_map)
+
+    df.loc[:, "Date"] = pd.to_datetime(df.loc[:, "Date"], dayfirst=True)
+
+    # Select latest day and last days
+    # df = df.groupby("PlayerID", group_keys=False).apply(
+    #     lambda group: group[
+    #         group["Date"] >= (group["Date"].max() - pd.Timedelta(days=20))
+    #     ]
+    # )
+
+    # Target date and past 20 days
+    # date_range_start = target_date - pd.Timedelta(days=20)
+
+    # df = df.groupby("PlayerID", group_keys=False).apply(
+    #     lambda group: group[
+    #         (group["Date"] >= date_range_start) & (group["Date"] <= target_date)
+    #     ]
+    # )
+
+    # Clean every distinct session code once
+    df["Session"] = normalize_sessions(df["Session"])
+
+    df = process_duplicates(df)
+
+    return df
+
+
+def training_days(history, loads, days=21):
+    """Sessions with any load per (PlayerID, Date) over the last `days` days."""
+    tensor = build_load_tensor(history, loads)
+
+    # Days with any load, and how many of each player's last `days` days had one
+    active = np.nansum(tensor["loads"], axis=2) > 0
+    counts = np.cumsum(active, axis=1)
+    counts[:, days:] -= counts[:, :-days]
+
+    players, day_numbers = np.nonzero(active)
+    return pd.DataFrame(
+        {
+            "PlayerID": tensor["players"][players],
+            "Date": tensor["start"] + day_numbers * ONE_DAY,
+            "training_days": counts[players, day_numbers],
+        }
+    )
+
+
+def filter_players(
+    df, date_from=None, date_to=None, min_training_days=None, history=None, loads=None
+):
+    """
+    Drop the scoring rows of players without enough history.
+
+    A row is excluded when the player has no other session in the previous
+    7 days (TD == TD-3 == TD-7) or, if `min_training_days` is set, fewer
+    training days than that in the last 21 days of `history` (the processed
+    sessions, defaults to `df`).
+
+    Returns the filtered frame and the excluded rows as a list of
+    {"PlayerID", "Date", "reason"} dicts.
+    """
+    # Rows with the latest date (or every date in the backfill range)
+    scoring = scoring_date_mask(df, date_from, date_to)
+
+    reasons = pd.Series(None, index=df.index, dtype=object)
+
+    no_recent = scoring & (df["TD"] == df["TD-3"]) & (df["TD"] == df["TD-7"])
+    reasons[no_recent] = "no other session in the last 7 days"
+
+    if min_training_days is not None:
+        history = df if history is None else history
+        loads = loads or cols_calculate_loads
+        counts = df.loc[scoring, ["PlayerID", "Date"]].merge(
+            training_days(history, loads), on=["PlayerID", "Date"], how="left"
+        )["training_days"].fillna(0)
+
+        too_few = pd.Series(False, index=df.index)
+        too_few[scoring] = (counts < min_training_days).to_numpy()
+        reasons[too_few & reasons.isna()] = (
+            f"fewer than {min_training_days} training days in the last 21"
+        )
+
+    excluded_mask = reasons.notna()
+    excluded = (
+        df.loc[excluded_mask, ["PlayerID", "Date"]]
+        .assign(reason=reasons[excluded_mask])
+        .to_dict("records")
+    )
+
+    # Renumbered without the second full copy reset_index makes
+    df = df[~excluded_mask]
+    df = df.set_axis(pd.RangeIndex(len(df)), copy=False)
+
+    return df, excluded
+
+
+def calculate_fatigue_metrics(df, metrics, drop_columns=columns_to_drop):
+    # Calculate ACWR, MSWR for all metrics, zero denominators guarded
+    ratios = workload_ratios(df, metrics)
+
+    return pd.concat([df.drop(columns=drop_columns), ratios], axis=1, copy=False)
+
+
+def encode_sessions(df, column_name="Session"):
+    """
+    One-hot encode the session type with the fixed schema the models expect.
+
+    Every Session_* column in `session_columns` is always present and in
+    model order, even when a session type is missing from the batch.
+    Unknown session types get all zeros.
+    """
+    sessions = df[column_name].astype(str).str.replace(" ", "", regex=False)
+    codes = pd.Categorical(sessions, categories=session_types).codes
+
+    one_hot = (codes[:, None] == np.arange(len(session_types))).astype(np.int64)
+    one_hot_df = pd.DataFrame(one_hot, index=df.index, columns=session_columns)
+
+    # Concatenate the original DataFrame with the one-hot encoding DataFrame
+    return pd.concat([df, one_hot_df], axis=1, copy=False)
+
+
+def process_data_testing(df, date_from=None, date_to=None):
+    # Scoring rows of the session types the models know, selected in one pass
+    scoring = scoring_date_mask(df, date_from, date_to) & df["Session"].isin(
+        session_types
+    )
+
+    columns_to_rename = [
+        "TD",
+        ">19.8",
+        ">25",
+        "ACC",
+        "DEC",
+        "Sprints",
+        "Mins",
+        "% Max Speed",
+    ]
+
+    # Rename columns by adding -1, on the fresh copy of the scoring rows
+    latest_date_rows = df[scoring].rename(
+        columns={col: f"{col}-1" for col in columns_to_rename}, copy=False
+    )
+    latest_date_rows = latest_date_rows.set_axis(
+        pd.RangeIndex(len(latest_date_rows)), copy=False
+    )
+
+    return encode_sessions(latest_date_rows)
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+
+from pipeline.tensor import LOAD_DTYPE, build_load_tensor, metric_view, row_sessions
+
+# Columns to exclude when the day is 3
+excluded_columns_3_days = [
+    "TD_Rel",
+    ">19.8_Rel",
+    ">25_Rel",
+    "ACC_Rel",
+    "DEC_Rel",
+    "% Max Speed",
+]
+
+
+class PrefixSums:
+    """Shared cumulative sum and sum-of-squares arrays for one metric.
+
+    `values` is the zero-filled daily calendar of the metric. Every window
+    length is served from the same two arrays, which are accumulated in
+    extended precision so window differences do not lose digits over long
+    multi-player calendars. Missing (NaN) loads are skipped as
+    rolling(min_periods=1) skips them: they add nothing to the sums and
+    are not counted as observations.
+    """
+
+    def __init__(self, values):
+        missing = np.isnan(values)
+        extended = np.where(missing, 0, values).astype(np.longdouble)
+        self.cumsum = np.concatenate([[0], np.cumsum(extended)])
+        self.cumsum_sq = np.concatenate([[0], np.cumsum(extended * extended)])
+        self.observed = np.concatenate([[0], np.cumsum(~missing)])
+
+        # Start of the run of identical values ending at every slot, missing
+        # loads carry the previous value so they do not break a run
+        last_observed = np.maximum.accumulate(
+            np.where(missing, 0, np.arange(len(values)))
+        )
+        carried = values[last_observed]
+        changed = np.ones(len(values), dtype=bool)
+        changed[1:] = carried[1:] != carried[:-1]
+        self.run_start = np.maximum.accumulate(
+            np.where(changed, np.arange(len(values)), 0)
+        )
+
+    def window(self, positions, block_starts, dia):
+        """Rolling sum, mean and std (ddof=1) of `dia` days ending at `positions`.
+
+        Windows never reach before `block_starts`, the first slot of the
+        row's player, which mirrors rolling(window=dia, min_periods=1):
+        a window without any observed load is NaN.
+        """
+        lower = np.maximum(positions - dia + 1, block_starts)
+        count = (self.observed[positions + 1] - self.observed[lower]).astype(float)
+
+        total = self.cumsum[positions + 1] - self.cumsum[lower]
+        squares = self.cumsum_sq[positions + 1] - self.cumsum_sq[lower]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = ((squares - total * total / count) / (count - 1)).astype(float)
+            mean = total.astype(float) / count
+
+        total = np.where(count > 0, total.astype(float), np.nan)
+        var = np.where(count > 1, np.maximum(var, 0.0), np.nan)
+
+        # Windows holding a single repeated value have exactly zero spread
+        constant = np.maximum(self.run_start[positions], block_starts) <= lower
+        var = np.where(constant & (count > 1), 0.0, var)
+
+        return total, mean, np.sqrt(var)
+
+
+def rolling_columns(columnas_calcular, dias):
+    """(name, load, window, statistic) of every rolling feature, in column order."""
+    columns = []
+    for dia in dias:
+        for col in columnas_calcular:
+            # Skip excluded columns when the day is 3
+            if dia != 1 and col in excluded_columns_3_days:
+                continue
+
+            columns.append((f"{col}-{dia}", col, dia, "sum"))
+            if dia in [7, 21]:
+                columns.append((f"{col}-{dia}-avg", col, dia, "avg"))
+                columns.append((f"{col}-{dia}-std", col, dia, "std"))
+
+    return columns
+
+
+def tensor_columns(columnas_calcular, dias):
+    """Columns of calcular_acumulado read from the load tensor, all float32."""
+    return list(columnas_calcular) + [
+        name for name, _, _, _ in rolling_columns(columnas_calcular, dias)
+    ]
+
+
+def calcular_acumulado(df, columnas_calcular, dias, calendar_start=None, rows=None):
+    """
+    Rolling sums, means and stds of the loads of every session.
+
+    The loads are laid out as a players x days float32 tensor (see
+    pipeline.tensor); the loads and features of the result are float32
+    columns read from it. `rows` optionally restricts the result to a
+    boolean mask of df's rows, the windows still reach into the rest.
+    """
+    columns = [col for col in columnas_calcular if col in df.columns]
+    tensor = build_load_tensor(df, columns, calendar_start)
+    n_days = tensor["loads"].shape[1]
+    codes, days = tensor["codes"], tensor["days"]
+
+    # Drop rows where all calculated values are zero (rest days)
+    row_loads = tensor["loads"][codes, days]
+    mask_non_zero = np.nansum(row_loads, axis=1) > 0
+    if rows is not None:
+        mask_non_zero &= np.asarray(rows, dtype=bool)
+
+    # Players in order of first appearance, dates ascending within each player
+    order = np.lexsort((days, codes))
+    order = order[mask_non_zero[order]]
+
+    # Renumbered without the second full copy reset_index makes
+    df_resultado = df.iloc[order].set_axis(pd.RangeIndex(len(order)), copy=False)
+    df_resultado.insert(0, "Date", pd.to_datetime(df_resultado.pop("Date")))
+    for position, col in enumerate(columns):
+        df_resultado[col] = row_loads[order, position]
+    if "sessions" in tensor:
+        df_resultado["Session"] = row_sessions(tensor)[order]
+
+    # Every player is one block of n_days slots of the flattened tensor
+    row_codes = codes[order]
+    row_positions = row_codes * n_days + days[order]
+    row_starts = row_codes * n_days + tensor["first"][row_codes]
+
+    features = rolling_columns(columns, dias)
+    values = np.empty((len(order), len(features)), dtype=LOAD_DTYPE)
+    for col in columns:
+        # One metric's prefix sums at a time, over every player's block of
+        # the flattened tensor, so missing loads must not reach the sums
+        prefix = PrefixSums(metric_view(tensor, col).ravel())
+        windows = {}
+        for position, (_, load, dia, statistic) in enumerate(features):
+            if load != col:
+                continue
+
+            if dia not in windows:
+                total, mean, std = prefix.window(row_positions, row_starts, dia)
+                windows[dia] = {"sum": total, "avg": mean, "std": std}
+            values[:, position] = windows[dia][statistic]
+
+    feature_df = pd.DataFrame(values, columns=[name for name, _, _, _ in features])
+
+    return pd.concat([df_resultado, feature_df], axis=1, copy=False)
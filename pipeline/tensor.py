@@ -0,0 +1,79 @@
+"""
+Dense players x days x metrics representation of the daily loads.
+
+Every player shares one day axis, from the earliest to the latest date of
+the frame, with zero load on the days without a session. The loads are a
+single float32 array and the session of every day an int8 code, so the
+rolling and filtering stages work on views of the array and pandas is only
+used to build it and to turn the results back into columns.
+"""
+import numpy as np
+import pandas as pd
+
+# 4 bytes a load: 60 players x five seasons x 7 loads take ~3 MB
+LOAD_DTYPE = np.float32
+
+# Session code of the days without a session
+NO_SESSION = -1
+
+ONE_DAY = np.timedelta64(1, "D")
+
+
+def build_load_tensor(df, metrics, calendar_start=None, dtype=LOAD_DTYPE):
+    """Lay the loads of a processed frame out as a players x days x metrics array.
+
+    `calendar_start` optionally maps PlayerID to an earlier first date, used
+    when `df` only holds the trailing part of a player's history. Returns a
+    dict with the "loads" array, the "sessions" (players x days) codes into
+    "session_types", every player's "first" day, the day axis "start" and
+    the (player, day) cell of every row of df as "codes" and "days".
+
+    Days without a session are 0, missing loads of a session stay NaN:
+    every stage reading the loads has to skip them (PrefixSums, nansum).
+    """
+    # Players in order of first appearance (same order as df["PlayerID"].unique())
+    codes, players = pd.factorize(df["PlayerID"], sort=False)
+    dates = pd.to_datetime(df["Date"]).dt.normalize().to_numpy()
+
+    first = pd.Series(dates).groupby(codes).min()
+    if calendar_start is not None:
+        known_start = pd.to_datetime(pd.Series(players).map(calendar_start))
+        first = first.where(~(known_start < first), known_start)
+
+    start = first.min().to_datetime64()
+    days = (dates - start) // ONE_DAY
+    n_days = int(days.max()) + 1 if len(days) else 0
+
+    loads = np.zeros((len(players), n_days, len(metrics)), dtype=dtype)
+    loads[codes, days] = df[metrics].to_numpy(dtype=dtype)
+
+    tensor = {
+        "players": players,
+        "start": start,
+        "first": ((first - start) // ONE_DAY).to_numpy(),
+        "codes": codes,
+        "days": days,
+        "metrics": list(metrics),
+        "loads": loads,
+    }
+
+    if "Session" in df.columns:
+        session_codes, session_types = pd.factorize(df["Session"])
+        code_dtype = np.int8 if len(session_types) < 128 else np.int16
+        sessions = np.full((len(players), n_days), NO_SESSION, dtype=code_dtype)
+        sessions[codes, days] = session_codes
+        tensor["sessions"] = sessions
+        tensor["session_types"] = session_types
+
+    return tensor
+
+
+def metric_view(tensor, metric):
+    """players x days view of one metric of the tensor (no copy)."""
+    return tensor["loads"][:, :, tensor["metrics"].index(metric)]
+
+
+def row_sessions(tensor):
+    """Session of every row the tensor was built from, as a categorical."""
+    codes = tensor["sessions"][tensor["codes"], tensor["days"]]
+    return pd.Categorical.from_codes(codes, categories=tensor["session_types"])
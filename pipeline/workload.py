@@ -0,0 +1,177 @@
+"""
+Workload ratios of the rolling load features, and EWMA loads.
+
+ACWR is the acute (7-day) over the chronic (21-day) mean load and MSWR the
+7-day mean over its standard deviation. The EWMA loads are the
+exponentially weighted alternative: updated recursively, they need no
+window of past loads. Every function takes the frame and the metrics
+explicitly, so the same code serves the daily, incremental and backfill
+paths.
+"""
+import numpy as np
+import pandas as pd
+
+from pipeline.tensor import LOAD_DTYPE
+
+# Denominator used where a chronic load or a weekly spread is zero
+MIN_THRESHOLD = 1e-5
+
+# Spans (days) of the exponentially weighted acute and chronic loads
+EWMA_SPANS = {"acute": 7, "chronic": 28}
+
+# Day numbers of the EWMA recursion are counted from here
+EPOCH = pd.Timestamp("1970-01-01")
+
+
+def guarded_divide(numerator, denominator, floor=MIN_THRESHOLD):
+    """numerator / denominator, dividing by `floor` where the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+
+    return np.divide(
+        numerator, denominator, out=numerator / floor, where=denominator != 0
+    )
+
+
+def workload_ratios(df, metrics, acute=7, chronic=21):
+    """ACWR and MSWR of every metric, from the -avg and -std rolling columns.
+
+    Both ratios of all metrics are one division over stacked
+    (ratio, row, metric) arrays. Returns {metric}_ACWR and {metric}_MSWR
+    columns aligned with df, in the precision of the rolling columns
+    (float32 from the load tensor).
+    """
+    acute_mean = df[[f"{metric}-{acute}-avg" for metric in metrics]].to_numpy()
+    chronic_mean = df[[f"{metric}-{chronic}-avg" for metric in metrics]].to_numpy()
+    acute_std = df[[f"{metric}-{acute}-std" for metric in metrics]].to_numpy()
+    dtype = np.result_type(acute_mean, chronic_mean, acute_std)
+
+    acwr, mswr = guarded_divide(
+        np.stack([acute_mean, acute_mean]), np.stack([chronic_mean, acute_std])
+    ).astype(dtype)
+
+    ratios = {}
+    for position, metric in enumerate(metrics):
+        ratios[f"{metric}_ACWR"] = acwr[:, position]
+        ratios[f"{metric}_MSWR"] = mswr[:, position]
+
+    return pd.DataFrame(ratios, index=df.index)
+
+
+def ewma_columns(metrics, spans=EWMA_SPANS):
+    """Feature columns of ewma_loads: a level per span and metric, then the ACWRs."""
+    columns = [f"{metric}-ewma-{name}" for name in spans for metric in metrics]
+    if "acute" in spans and "chronic" in spans:
+        columns += [f"{metric}_EWMA_ACWR" for metric in metrics]
+    return columns
+
+
+def ewma_loads(loads, metrics, state=None, spans=EWMA_SPANS, rows=None):
+    """Exponentially weighted acute and chronic loads of every metric.
+
+    `loads` holds one row of daily loads per (PlayerID, Date); rest days
+    need no row. Every load is a recursive update of the player's previous
+    level: after a gap of g days, level = (1 - alpha)^g * level + alpha *
+    load, with alpha = 2 / (span + 1), so a new day costs O(1) per player
+    and no window of past loads is kept. A player's first load starts the
+    level; missing loads count as zero.
+
+    `state` is the state returned by a previous call (levels and last
+    date per player) to continue from; it must be older than `loads`.
+    `rows` optionally restricts the features to a boolean mask of loads'
+    rows, the recursion still runs over every load.
+
+    Returns (features, state). features has PlayerID, Date and the float32
+    ewma_columns for every (selected) row of loads with a player and a date.
+    """
+    valid = (loads["PlayerID"].notna() & loads["Date"].notna()).to_numpy()
+    wanted = valid if rows is None else valid & np.asarray(rows, dtype=bool)
+    loads = loads.loc[valid, ["PlayerID", "Date"] + list(metrics)]
+
+    names = list(spans)
+    level_columns = [f"{metric}-ewma-{name}" for name in names for metric in metrics]
+    alphas = np.array([2 / (spans[name] + 1) for name in names])
+
+    # Rows sorted by player and day, each player's rows one contiguous block
+    codes, players = pd.factorize(loads["PlayerID"])
+    days = (pd.to_datetime(loads["Date"]) - EPOCH) // pd.Timedelta(days=1)
+    order = np.lexsort((days.to_numpy(), codes))
+    codes, days = codes[order], days.to_numpy()[order]
+    values = np.nan_to_num(loads[metrics].to_numpy(dtype=float)[order])
+    wanted = wanted[valid][order]
+
+    # Level (player, span, metric) and day of the last update, NaN when unseen
+    level = np.full((len(players), len(names), len(metrics)), np.nan)
+    last_day = np.full(len(players), np.nan)
+    if state is not None and not state.empty:
+        known = state.set_index("PlayerID").reindex(players)
+        level[:] = known[level_columns].to_numpy(dtype=float).reshape(level.shape)
+        last_day[:] = (known["Date"] - EPOCH) / pd.Timedelta(days=1)
+
+    counts = np.bincount(codes, minlength=len(players))
+    block_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    # Features are only kept for the selected rows, -1 for the others
+    slots = np.full(len(codes), -1)
+    slots[wanted] = np.arange(wanted.sum())
+    levels = np.empty((wanted.sum(), len(names), len(metrics)))
+
+    # Step k updates every player's k-th load at once
+    for k in range(counts.max(initial=0)):
+        active = np.flatnonzero(counts > k)
+        current = block_starts[active] + k
+
+        gap = days[current] - last_day[active]
+        decay = (1 - alphas)[None, :] ** gap[:, None]
+        load = values[current][:, None, :]
+        updated = decay[:, :, None] * level[active] + alphas[None, :, None] * load
+
+        first = np.isnan(gap)
+        updated[first] = np.broadcast_to(load, updated.shape)[first]
+
+        level[active] = updated
+        last_day[active] = days[current]
+
+        slot = slots[current]
+        levels[slot[slot >= 0]] = updated[slot >= 0]
+
+    features = pd.DataFrame(
+        levels.reshape(len(levels), -1).astype(LOAD_DTYPE), columns=level_columns
+    )
+    features.insert(0, "PlayerID", loads["PlayerID"].to_numpy()[order][wanted])
+    features.insert(1, "Date", EPOCH + pd.to_timedelta(days[wanted], unit="D"))
+
+    if "acute" in spans and "chronic" in spans:
+        acwr = guarded_divide(
+            levels[:, names.index("acute")], levels[:, names.index("chronic")]
+        ).astype(LOAD_DTYPE)
+        for position, metric in enumerate(metrics):
+            features[f"{metric}_EWMA_ACWR"] = acwr[:, position]
+
+    # Players without new loads keep their previous state
+    new_state = pd.DataFrame(level.reshape(len(players), -1), columns=level_columns)
+    new_state.insert(0, "PlayerID", players)
+    new_state.insert(1, "Date", EPOCH + pd.to_timedelta(last_day, unit="D"))
+    if state is not None and not state.empty:
+        kept = state[~state["PlayerID"].isin(players)]
+        new_state = pd.concat([kept, new_state], ignore_index=True)
+
+    index = loads.index[order][wanted]
+    return features.set_index(index).sort_index(), new_state
+
+
+def add_ewma_features(cumulative_df, features):
+    """Join the EWMA features of ewma_loads onto rolling features by (PlayerID, Date)."""
+    return cumulative_df.merge(features, on=["PlayerID", "Date"], how="left")
+
+
+def ewma_acwr(history, metrics, acute_span=7, chronic_span=28):
+    """EWMA-based ACWR of every metric for every row of `history`.
+
+    `history` holds one row of daily loads per (PlayerID, Date). Returns
+    {metric}_EWMA_ACWR columns aligned with history (see ewma_loads).
+    """
+    features, _ = ewma_loads(
+        history, metrics, spans={"acute": acute_span, "chronic": chronic_span}
+    )
+    return features[[f"{metric}_EWMA_ACWR" for metric in metrics]]
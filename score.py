@@ -0,0 +1,142 @@
+import argparse
+
+from pipeline.backfill import add_backfill_args, backfill_filename, scoring_date_mask
+from pipeline.columns import (
+    cols_calculate_fatigues,
+    cols_calculate_loads,
+    metrics_results,
+)
+from pipeline.export import export_excel
+from pipeline.feature_store import update_feature_store
+from pipeline.models import MODELS, available_models, predict_risk, risk_thresholds
+from pipeline.processing import (
+    calculate_fatigue_metrics,
+    data_processing,
+    filter_players,
+    process_data_testing,
+    read_files,
+)
+from pipeline.rolling import calcular_acumulado
+from pipeline.workload import add_ewma_features, ewma_loads
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score injury risk with every registered model in one run."
+    )
+    parser.add_argument(
+        "--models",
+        nargs="+",
+        choices=list(MODELS),
+        help="Models to score with (default: every model whose pickle is present).",
+    )
+    parser.add_argument(
+        "--min-training-days",
+        type=int,
+        help="Also skip players with fewer training days than this in the last 21.",
+    )
+    add_backfill_args(parser)
+    return parser.parse_args(argv)
+
+
+def index_column(name, model_names):
+    # A single model keeps the historical "Index" column name
+    if len(model_names) == 1:
+        return "Index"
+    return f"Index_{name}"
+
+
+def report_excluded(excluded):
+    if not excluded:
+        return
+
+    print(f"{len(excluded)} sessions not scored for lack of history:")
+    for row in excluded:
+        print(f"  PlayerID {row['PlayerID']} on {row['Date'].date()}: {row['reason']}")
+
+
+def build_features(processed_df, date_from=None, date_to=None, min_training_days=None):
+    """Feature rows to score, computed once and shared by every model."""
+    if date_from is not None or date_to is not None:
+        # Features of the sessions in the range, windows over the whole history
+        scoring = scoring_date_mask(processed_df, date_from, date_to)
+        cumulative_df = calcular_acumulado(
+            processed_df, cols_calculate_loads, [3, 7, 21], rows=scoring
+        )
+        ewma_features, _ = ewma_loads(
+            processed_df, cols_calculate_fatigues, rows=scoring
+        )
+        cumulative_df = add_ewma_features(cumulative_df, ewma_features)
+    else:
+        # Rolling and EWMA loads for the sessions not yet in the feature store
+        cumulative_df = update_feature_store(
+            processed_df,
+            cols_calculate_loads,
+            [3, 7, 21],
+            ewma_metrics=cols_calculate_fatigues,
+        )
+
+    # Filter players with enough data
+    filtered_df, excluded = filter_players(
+        cumulative_df,
+        date_from,
+        date_to,
+        min_training_days=min_training_days,
+        history=processed_df,
+    )
+    report_excluded(excluded)
+
+    complete_df = calculate_fatigue_metrics(filtered_df, cols_calculate_fatigues)
+
+    return process_data_testing(complete_df, date_from, date_to)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    backfill = args.date_from is not None or args.date_to is not None
+
+    model_names = args.models or available_models()
+    if not model_names:
+        print("No model files found. Exiting program.")
+        return None
+
+    # Call the function to process files in the current directory
+    data_df = read_files()
+
+    if data_df is None:
+        print("File reading failed. Exiting program.")
+        return None
+
+    processed_df = data_processing(data_df)
+
+    processed_df.to_excel("processed_newdata.xlsx", index=False)
+
+    test_df = build_features(
+        processed_df, args.date_from, args.date_to, args.min_training_days
+    )
+
+    if test_df.empty:
+        print("No sessions to score for the selected dates. Exiting program.")
+        return None
+
+    index_columns = []
+    thresholds = {}
+    for name in model_names:
+        column = index_column(name, model_names)
+        test_df[column] = predict_risk(name, test_df)
+        index_columns.append(column)
+        thresholds[column] = risk_thresholds(name)
+
+    # The session date, the daily file name only carries the run date
+    keys = ["PlayerID", "Date", "Session"] if backfill else ["PlayerID", "Date"]
+    results_df = test_df[keys + index_columns + metrics_results[2:]]
+
+    if backfill:
+        filename = backfill_filename(args.date_from, args.date_to, test_df["Date"])
+        return export_excel(results_df, filename, thresholds)
+
+    return export_excel(results_df, thresholds=thresholds)
+
+
+if __name__ == "__main__":
+    main()